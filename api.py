@@ -0,0 +1,145 @@
+import json
+from datetime import datetime
+from flask import Blueprint, Response, abort, g, jsonify, request, stream_with_context
+from models import db, Artist, Venue, Show
+from pagination import paginate
+from catalog import EXPORT_FORMATS, export_rows
+
+#----------------------------------------------------------------------------#
+# JSON API.
+#----------------------------------------------------------------------------#
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+RESOURCES = {
+    'artists': Artist,
+    'venues': Venue,
+    'shows': Show,
+}
+
+# rows fetched per round trip when streaming a whole collection
+STREAM_BATCH_SIZE = 1000
+
+
+def _model(resource):
+    model = RESOURCES.get(resource)
+    if model is None:
+        abort(404)
+    return model
+
+
+def _fields(model):
+    return [column.key for column in model.__table__.columns
+            if column.key != 'search_vector']
+
+
+def _selected_fields(model):
+    # ?fields=name,city limits the columns fetched; id is always included
+    available = _fields(model)
+    requested = request.args.get('fields')
+    if not requested:
+        return available
+    return ['id'] + [field for field in requested.split(',')
+                     if field in available and field != 'id']
+
+
+def _arg(name, type):
+    # like request.args.get(name, type=type), but a malformed value is a
+    # 400 rather than silently dropped (a dropped ?since= is a full dump)
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return type(value)
+    except ValueError:
+        abort(400)
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _row_dict(fields, row):
+    return {field: _jsonable(value) for field, value in zip(fields, row)}
+
+
+def _conditional(response):
+    # answers If-None-Match with 304 when the body has not changed
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def _stream(query, fields):
+    # a server-side cursor fetched in batches, so the full result list is
+    # never held in memory
+    rows = query.execution_options(
+        stream_results=True).yield_per(STREAM_BATCH_SIZE)
+
+    def generate():
+        yield '{"data": ['
+        for index, row in enumerate(rows):
+            yield (', ' if index else '') + json.dumps(_row_dict(fields, row))
+        yield ']}'
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+@api.route('/<resource>')
+def list_resource(resource):
+    model = _model(resource)
+    fields = _selected_fields(model)
+    query = db.session.query(*[getattr(model, field) for field in fields])
+
+    if request.args.get('stream'):
+        return _stream(query.order_by(model.id), fields)
+
+    rows, next_cursor = paginate(query, [model.id], key=lambda row: [row[0]])
+    return _conditional(jsonify({
+        'data': [_row_dict(fields, row) for row in rows],
+        'next': next_cursor,
+    }))
+
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'columns': 'application/x-ndjson',
+}
+
+
+@api.route('/<resource>/export')
+def export_resource(resource):
+    # ?since_id= / ?since= (ISO timestamp) give incremental deltas
+    model = _model(resource)
+    format = request.args.get('format', 'ndjson')
+    if format not in EXPORT_FORMATS:
+        abort(400)
+    since_id = _arg('since_id', int)
+    since = _arg('since', datetime.fromisoformat)
+    # full-table reads outlast the default statement timeout
+    g.statement_timeout = 0
+    return Response(
+        stream_with_context(export_rows(model, format, since_id, since)),
+        mimetype=EXPORT_MIMETYPES[format])
+
+
+@api.route('/<resource>/<int:id>')
+def get_resource(resource, id):
+    model = _model(resource)
+    fields = _selected_fields(model)
+    row = db.session.query(
+        *[getattr(model, field) for field in fields]).filter(model.id == id).first()
+    if row is None:
+        abort(404)
+    return _conditional(jsonify({'data': _row_dict(fields, row)}))
+
+
+@api.errorhandler(400)
+def bad_request_error(error):
+    return jsonify({'error': 'bad request'}), 400
+
+
+@api.errorhandler(404)
+def not_found_error(error):
+    return jsonify({'error': 'not found'}), 404
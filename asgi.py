@@ -0,0 +1,7 @@
+# Optional ASGI entry point: uvicorn --workers 4 asgi:application
+# Needs `pip install asgiref uvicorn`. Views stay synchronous; the adapter
+# runs them in a thread pool so slow clients do not tie up a worker.
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+
+application = WsgiToAsgi(create_app())
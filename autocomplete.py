@@ -0,0 +1,244 @@
+import heapq
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from itertools import islice
+from flask import current_app
+from models import db, Artist, Venue, Watermark
+
+#----------------------------------------------------------------------------#
+# Name autocomplete.
+#----------------------------------------------------------------------------#
+
+KINDS = {'artist': Artist, 'venue': Venue}
+
+# rows committed a little after a refresh can carry an older updated_at,
+# so each refresh re-reads this much before the newest one it has seen
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+def normalize(text):
+    return ' '.join((text or '').casefold().split())
+
+
+def _keys(name):
+    # one key per word start, so 'hall' finds 'Blue Velvet Hall'
+    words = normalize(name).split(' ')
+    return {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+class PrefixIndex(object):
+    '''
+    Names of one kind as a sorted list of keys with a parallel array of
+    ids. A lookup is a bisect to the first key at or after the prefix and
+    a scan that stops at the first key not starting with it, so it costs
+    O(log n + k). Plain lists of str and an int array keep the per-name
+    overhead low compared to tuples or a trie of dicts.
+
+    The two lists must change together, so writes and reads hold a lock;
+    gthread workers serve several requests at once.
+    '''
+
+    def __init__(self):
+        self._names = {}
+        self._keys = []
+        self._ids = array('q')
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def load(self, rows):
+        # rebuilds from (id, name) rows; readers keep the old lists until
+        # the new ones are swapped in
+        names = {id: name for id, name in rows if name}
+        entries = sorted((key, id) for id, name in names.items() for key in _keys(name))
+        keys = [key for key, _ in entries]
+        ids = array('q', (id for _, id in entries))
+        with self._lock:
+            self._names, self._keys, self._ids = names, keys, ids
+
+    def add(self, id, name):
+        with self._lock:
+            self._remove(id)
+            if name:
+                self._insert(id, name)
+
+    def remove(self, id):
+        with self._lock:
+            self._remove(id)
+
+    def _insert(self, id, name):
+        self._names[id] = name
+        for key in _keys(name):
+            index = bisect_right(self._keys, key)
+            self._keys.insert(index, key)
+            self._ids.insert(index, id)
+
+    def _remove(self, id):
+        name = self._names.pop(id, None)
+        if name is None:
+            return
+        for key in _keys(name):
+            index = bisect_left(self._keys, key)
+            while index < len(self._keys) and self._keys[index] == key:
+                if self._ids[index] == id:
+                    del self._keys[index]
+                    del self._ids[index]
+                    break
+                index += 1
+
+    def matches(self, prefix, limit):
+        '''Returns up to `limit` (key, id, name) for names with a word starting with `prefix`.'''
+        results = []
+        seen = set()
+        with self._lock:
+            keys, ids, names = self._keys, self._ids, self._names
+            index = bisect_left(keys, prefix)
+            while index < len(keys) and len(results) < limit:
+                key = keys[index]
+                if not key.startswith(prefix):
+                    break
+                id = ids[index]
+                index += 1
+                if id not in seen and id in names:
+                    seen.add(id)
+                    results.append((key, id, names[id]))
+        return results
+
+    def memory(self):
+        # bytes held by the key list and strings, the id array and the
+        # name map; small ints are shared by the interpreter and not counted
+        with self._lock:
+            return self._memory()
+
+    def _memory(self):
+        size = sys.getsizeof(self._keys) + sys.getsizeof(self._ids) + sys.getsizeof(self._names)
+        size += sum(sys.getsizeof(key) for key in self._keys)
+        size += sum(sys.getsizeof(name) for name in self._names.values())
+        return size
+
+
+class NameIndex(object):
+    '''
+    In-process prefix index over artist and venue names for /autocomplete.
+    A background thread per process (started as each gunicorn worker
+    boots, or by the first lookup) builds it in full, then brings it up to
+    date every AUTOCOMPLETE_REFRESH_SECONDS from rows whose updated_at
+    moved, so edits made through other workers show up; a venue delete
+    triggers a full reload. Requests only read the index. The worker
+    handling a create or edit applies it at once through add() and remove().
+    '''
+
+    def __init__(self, app=None):
+        self.indexes = {kind: PrefixIndex() for kind in KINDS}
+        self.limit = 10
+        self.refresh_seconds = 5
+        self._lock = threading.Lock()
+        self._refreshed = None
+        self._since = None
+        self._deleted = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stopped = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.limit = app.config.get('AUTOCOMPLETE_LIMIT', 10)
+        self.refresh_seconds = app.config.get('AUTOCOMPLETE_REFRESH_SECONDS', 5)
+
+    def refresh(self):
+        # one refresh at a time; the indexes lock themselves for each change
+        with self._lock:
+            deleted = db.session.query(Watermark.value).filter(
+                Watermark.name == 'venue_deleted').scalar()
+            full = self._since is None or deleted != self._deleted
+            since = None if full else self._since
+            for kind, model in KINDS.items():
+                query = db.session.query(model.id, model.name)
+                if since is not None:
+                    query = query.filter(model.updated_at >= since - REFRESH_OVERLAP)
+                if full:
+                    self.indexes[kind].load(query)
+                else:
+                    for id, name in query:
+                        self.indexes[kind].add(id, name)
+            # the newest updated_at is an index lookup on each table
+            newest = [db.session.query(db.func.max(model.updated_at)).as_scalar()
+                      for model in KINDS.values()]
+            newest = [value for value in db.session.query(*newest).one() if value]
+            db.session.rollback()
+            self._since = max(newest, default=self._since)
+            self._deleted = deleted
+            self._refreshed = time.monotonic()
+
+    def start(self, app):
+        '''Starts the refresh thread for `app`, once per process.'''
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(app,), name='autocomplete-refresh', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self, app):
+        while not self._stopped.is_set():
+            if self._refreshed is None or \
+                    time.monotonic() - self._refreshed >= self.refresh_seconds:
+                try:
+                    with app.app_context():
+                        try:
+                            self.refresh()
+                        finally:
+                            db.session.remove()
+                except Exception:
+                    app.logger.exception('Could not refresh the autocomplete index')
+            self._stopped.wait(self.refresh_seconds)
+
+    def add(self, kind, id, name):
+        self.indexes[kind].add(id, name)
+
+    def remove(self, kind, id):
+        self.indexes[kind].remove(id)
+
+    def lookup(self, prefix, kind=None, limit=None):
+        '''
+        Returns up to `limit` {type, id, name} dicts for artists and venues
+        (or one `kind`) with a name word starting with `prefix`, ordered by
+        the matching text.
+        '''
+        if self._thread is None:
+            # not started by the server (flask run, uvicorn): the first
+            # lookups may miss names until the thread has built the index
+            self.start(current_app._get_current_object())
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        limit = min(max(limit or self.limit, 1), 50)
+        kinds = [kind] if kind in KINDS else list(KINDS)
+        streams = [[(key, kind, id, name) for key, id, name in
+                    self.indexes[kind].matches(prefix, limit)] for kind in kinds]
+        return [{'type': kind, 'id': id, 'name': name}
+                for _, kind, id, name in islice(heapq.merge(*streams), limit)]
+
+    def stats(self):
+        stats = {}
+        for kind, index in self.indexes.items():
+            memory = index.memory()
+            stats[kind] = {
+                'names': len(index),
+                'bytes': memory,
+                'bytes_per_million_names': int(memory / len(index) * 1000000) if len(index) else 0,
+            }
+        return stats
+
+
+name_index = NameIndex()
@@ -0,0 +1,64 @@
+'''
+Micro-benchmark for the datetime template filter on a /shows page:
+
+    python bench_datetime.py --rows 10000
+
+Formats `--rows` show start times the way pages/shows.html does, once
+with utils.format_datetime (datetimes passed through, compiled patterns,
+memoized results) and once with the old filter, which parsed str(start_time)
+with dateutil and formatted with babel.dates.format_datetime.
+Times are spread over half-hour slots, so a page repeats some of them.
+'''
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+import babel.dates
+import dateutil.parser
+from utils import DATETIME_FORMATS, format_datetime, _format_datetime
+
+
+def old_format_datetime(value, format='medium'):
+    date = dateutil.parser.parse(value)
+    return babel.dates.format_datetime(date, DATETIME_FORMATS.get(format, format), locale='en')
+
+
+def start_times(rows, slots):
+    start = datetime(2026, 1, 1, 19)
+    return [start + timedelta(minutes=30 * (i % slots)) for i in range(rows)]
+
+
+def timed(render, repeat):
+    runs = []
+    for _ in range(repeat):
+        _format_datetime.cache_clear()
+        started = time.perf_counter()
+        render()
+        runs.append((time.perf_counter() - started) * 1000)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--slots', type=int, default=2000,
+                        help='distinct start times on the page')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    times = start_times(args.rows, args.slots)
+    strings = [str(value) for value in times]
+    assert [old_format_datetime(value, 'full') for value in strings[:100]] == \
+        [format_datetime(value, 'full') for value in times[:100]]
+
+    old = timed(lambda: [old_format_datetime(value, 'full') for value in strings], args.repeat)
+    new = timed(lambda: [format_datetime(value, 'full') for value in times], args.repeat)
+    print(f'{args.rows} rows, {args.slots} distinct times, median of {args.repeat} runs')
+    print(f'{old:>9.1f} ms  dateutil + babel.dates.format_datetime')
+    print(f'{new:>9.1f} ms  utils.format_datetime')
+    print(f'{old / new:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+'''
+Route benchmarks against the configured database. Seed it first, e.g.
+
+    flask catalog seed --shows 100000 --seed 1
+    flask catalog geocode
+    python benchmark.py --label 100k --save     # record a baseline
+    python benchmark.py --label 100k --check    # fail on regressions
+
+--check skips (and exits 0) when there is no baseline for the label.
+CI records one on the pull request's base commit and checks the head
+against it on the same runner (.github/workflows/ci.yml).
+
+Every GET route is timed in-process with the test client, plus the two
+search POSTs and /venues/nearby around New York; routes that write or
+dump whole tables are skipped.
+Baselines live in benchmarks/baseline-<label>.json.
+'''
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from flask import url_for
+from app import create_app
+from api import RESOURCES
+from models import db, Artist, Venue, Show
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+SKIPPED_ENDPOINTS = {'static', 'api.export_resource', 'main.venues_nearby'}
+
+# GET routes that need query arguments
+QUERIES = [
+    '/venues/nearby?lat=40.7128&lng=-74.006&radius=25',
+]
+
+SEARCHES = [
+    ('/venues/search', {'search_term': 'Blue'}),
+    ('/artists/search', {'search_term': 'Hall'}),
+]
+
+
+def sample_ids():
+    return {
+        'artist_id': db.session.query(Artist.id).order_by(Artist.id).limit(1).scalar(),
+        'venue_id': db.session.query(Venue.id).order_by(Venue.id).limit(1).scalar(),
+        'id': db.session.query(Show.id).order_by(Show.id).limit(1).scalar(),
+    }
+
+
+def requests_to_time(app):
+    with app.app_context():
+        ids = sample_ids()
+    for rule in app.url_map.iter_rules():
+        if 'GET' not in rule.methods or rule.endpoint in SKIPPED_ENDPOINTS:
+            continue
+        resources = RESOURCES if 'resource' in rule.arguments else [None]
+        for resource in resources:
+            values = {name: ids.get(name) for name in rule.arguments}
+            if resource is not None:
+                values['resource'] = resource
+            if None in values.values():
+                continue
+            with app.test_request_context():
+                path = url_for(rule.endpoint, **values)
+            yield f'GET {path}', 'get', path, None
+    for path in QUERIES:
+        yield f'GET {path}', 'get', path, None
+    for path, form in SEARCHES:
+        yield f'POST {path}', 'post', path, form
+
+
+def measure(client, method, path, data, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = getattr(client, method)(path, data=data)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 500:
+            raise RuntimeError(f'{method.upper()} {path} returned {response.status_code}')
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(int(len(timings) * 0.95), len(timings) - 1)], 3),
+    }
+
+
+def regressions(results, baseline, tolerance, slack_ms):
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        limit = before['median_ms'] * (1 + tolerance) + slack_ms
+        if result['median_ms'] > limit:
+            yield name, before['median_ms'], result['median_ms']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--label', default='default', help='Data scale the baseline belongs to.')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--save', action='store_true', help='Store the results as the baseline.')
+    parser.add_argument('--check', action='store_true', help='Exit 1 on a regression.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown over the baseline median (fraction).')
+    parser.add_argument('--slack-ms', type=float, default=2.0,
+                        help='Absolute allowance, so sub-millisecond noise does not fail.')
+    args = parser.parse_args()
+
+    app = create_app(os.environ.get('FYYUR_ENV', 'testing'))
+    client = app.test_client()
+    results = {}
+    for name, method, path, data in requests_to_time(app):
+        # one untimed request warms pools and compiled statements
+        getattr(client, method)(path, data=data)
+        results[name] = measure(client, method, path, data, args.iterations)
+        print(f"{name:<45} median {results[name]['median_ms']:>9.2f} ms  "
+              f"p95 {results[name]['p95_ms']:>9.2f} ms")
+
+    baseline_path = os.path.join(BASELINE_DIR, f'baseline-{args.label}.json')
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f'Baseline written to {baseline_path}')
+
+    if args.check:
+        if not os.path.exists(baseline_path):
+            # nothing to compare against yet, e.g. a fresh checkout
+            print(f'Skipping check: no baseline at {baseline_path}; run with --save first')
+            return
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+        failed = list(regressions(results, baseline, args.tolerance, args.slack_ms))
+        for name, before, after in failed:
+            print(f'REGRESSION {name}: {before:.2f} ms -> {after:.2f} ms')
+        if failed:
+            sys.exit(1)
+        print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
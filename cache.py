@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import g
+from sqlalchemy.dialects.postgresql import insert
+from models import db, CacheVersion
+
+#----------------------------------------------------------------------------#
+# View model cache.
+#----------------------------------------------------------------------------#
+
+
+class LRUCache(object):
+    '''In-process cache holding at most `max_entries` values for `ttl` seconds.'''
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedCache(object):
+    '''
+    Cache shared between processes through a Redis-like `client` (anything
+    with get, setex and delete). Values are stored as JSON; expiry and
+    eviction are left to the server.
+    '''
+
+    def __init__(self, client, ttl=300, prefix='fyyur:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value):
+        self.client.setex(self.prefix + key, self.ttl, json.dumps(value))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        pass
+
+
+class LocalClient(object):
+    '''
+    In-process stand-in for the Redis client of SharedCache (get, setex,
+    delete over a dict), for tests and single-process runs.
+    '''
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._values.pop(key, None)
+                return None
+            return entry[1]
+
+    def setex(self, key, ttl, value):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+
+class ViewCache(object):
+    '''
+    Read-through cache for rendered page view models, configured from
+    CACHE_REDIS_URL, CACHE_TTL and CACHE_MAX_ENTRIES by init_app().
+
+    Without Redis every worker has its own LRUCache, and a delete only
+    reaches the worker that made the write; with Redis a request running
+    alongside the write can store a view model built before its commit.
+    So entries are stored with the key's row in CacheVersion, which
+    invalidate() bumps inside the writing transaction. get() compares the
+    two, one primary key lookup, and drops an entry as soon as the write
+    commits, on every worker and with either backend.
+    '''
+
+    def __init__(self, backend=None):
+        self.backend = backend or LRUCache()
+        self.stale = 0
+
+    def init_app(self, app):
+        ttl = app.config.get('CACHE_TTL', 300)
+        redis_url = app.config.get('CACHE_REDIS_URL')
+        if redis_url:
+            import redis
+            self.backend = SharedCache(redis.Redis.from_url(redis_url), ttl=ttl)
+        else:
+            self.backend = LRUCache(
+                app.config.get('CACHE_MAX_ENTRIES', 1024), ttl=ttl)
+
+    def _version(self, key):
+        # remembered for set(): the version is read before the view model
+        # is built, so a write landing in between leaves the entry stale
+        versions = g.setdefault('cache_versions', {})
+        if key not in versions:
+            versions[key] = db.session.query(CacheVersion.version).filter(
+                CacheVersion.key == key).scalar() or 0
+        return versions[key]
+
+    def get(self, key):
+        version = self._version(key)
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        if entry[0] != version:
+            self.stale += 1
+            self.backend.delete(key)
+            return None
+        return entry[1]
+
+    def set(self, key, value):
+        self.backend.set(key, (self._version(key), value))
+
+    def invalidate(self, *keys):
+        '''Call before committing the write that makes `keys` stale.'''
+        self.backend.delete(*keys)
+        if keys:
+            statement = insert(CacheVersion.__table__).values(
+                [{'key': key, 'version': 1} for key in keys])
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=['key'],
+                set_={'version': CacheVersion.version + 1}))
+
+    def stats(self):
+        backend = self.backend
+        return {
+            'backend': type(backend).__name__,
+            'hits': backend.hits,
+            'misses': backend.misses,
+            'evictions': backend.evictions,
+            'stale': self.stale,
+        }
+
+
+def artist_key(artist_id):
+    return f'artist:{artist_id}'
+
+
+def venue_key(venue_id):
+    return f'venue:{venue_id}'
+
+
+cache = ViewCache()
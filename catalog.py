@@ -0,0 +1,408 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+import click
+from datetime import datetime
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, func
+from sqlalchemy.exc import DataError, IntegrityError
+from werkzeug.datastructures import MultiDict
+from wtforms import DateTimeField
+from wtforms.fields.core import UnboundField
+from forms import ArtistForm, VenueForm, ShowForm
+from models import db, Artist, Venue, Show, Watermark
+from queries import refresh_show_counts, hot_queries, seq_scans
+import geo
+import synthetic
+
+#----------------------------------------------------------------------------#
+# Catalogue CLI.
+#----------------------------------------------------------------------------#
+
+catalog_cli = AppGroup('catalog', help='Bulk import and export of the catalogue.')
+
+MODELS = {
+    'artists': (Artist, ArtistForm),
+    'venues': (Venue, VenueForm),
+    'shows': (Show, ShowForm),
+}
+
+
+def read_rows(path):
+    # NDJSON lines or CSV rows, one dict at a time; CSV genres are ';' separated
+    if path.endswith(('.ndjson', '.jsonl')):
+        with open(path) as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, newline='') as file:
+            for row in csv.DictReader(file):
+                if row.get('genres'):
+                    row['genres'] = row['genres'].split(';')
+                yield row
+
+
+def _datetime_formats(form_class):
+    # {field name: format} of the form's DateTimeFields
+    formats = {}
+    for name in dir(form_class):
+        field = getattr(form_class, name)
+        if isinstance(field, UnboundField) and issubclass(field.field_class, DateTimeField):
+            formats[name] = field.kwargs.get('format', '%Y-%m-%d %H:%M:%S')
+    return formats
+
+
+def _form_value(value, format):
+    # exports write times as ISO 8601; the form wants its own format
+    if isinstance(value, str) and format is not None:
+        try:
+            return datetime.fromisoformat(value).strftime(format)
+        except ValueError:
+            pass
+    return value
+
+
+def validate_row(form_class, row):
+    '''
+    Runs `row` through the same form the create handlers use. Returns
+    (values, None) for a valid row and (None, errors) otherwise.
+    '''
+    formats = _datetime_formats(form_class)
+    pairs = []
+    for name, value in row.items():
+        value = _form_value(value, formats.get(name))
+        values = value if isinstance(value, list) else [value]
+        pairs.extend((name, item) for item in values if item is not None)
+    form = form_class(formdata=MultiDict(pairs), meta={'csrf': False})
+    valid = form.validate()
+    errors = dict(form.errors)
+    id = row.get('id')
+    if id not in (None, '') and (isinstance(id, bool) or not str(id).isdigit()):
+        errors['id'] = ['Not a valid id.']
+    if not valid or errors:
+        return None, errors
+    values = {name: field.data for name, field in form._fields.items()}
+    if id not in (None, ''):
+        values['id'] = int(id)
+    return values, None
+
+
+def _insert_batch(model, batch):
+    # one executemany per batch; if the batch fails, retry row by row so
+    # only the offending rows are rejected
+    try:
+        db.session.execute(model.__table__.insert(), batch)
+        db.session.commit()
+        return []
+    except (IntegrityError, DataError):
+        db.session.rollback()
+
+    rejected = []
+    for values in batch:
+        try:
+            db.session.execute(model.__table__.insert(), [values])
+            db.session.commit()
+        except (IntegrityError, DataError) as error:
+            db.session.rollback()
+            rejected.append((values, str(error.orig)))
+    return rejected
+
+
+def _sync_id_sequence(model):
+    # rows imported with explicit ids leave the Postgres sequence behind
+    if db.engine.dialect.name == 'postgresql':
+        table = model.__tablename__
+        db.session.execute(
+            f'SELECT setval(pg_get_serial_sequence(\'"{table}"\', \'id\'), '
+            f'coalesce(max(id), 1)) FROM "{table}"')
+        db.session.commit()
+
+
+@catalog_cli.command('import')
+@click.argument('kind', type=click.Choice(sorted(MODELS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--resume', is_flag=True, help='Skip rows committed by a previous run.')
+def import_command(kind, path, batch_size, resume):
+    """Load artists, venues or shows from a CSV or NDJSON file."""
+    model, form_class = MODELS[kind]
+    checkpoint_path = path + '.checkpoint'
+    rejects_path = path + '.rejects'
+
+    skip = 0
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as file:
+            skip = int(file.read() or 0)
+        click.echo(f'Resuming after row {skip}')
+
+    loaded = rejected = consumed = 0
+    started = time.monotonic()
+    batch = []
+
+    def flush():
+        nonlocal loaded, rejected
+        failures = _insert_batch(model, batch) if batch else []
+        for values, error in failures:
+            rejects.write(json.dumps({'row': values, 'errors': error}, default=str) + '\n')
+        loaded += len(batch) - len(failures)
+        rejected += len(failures)
+        batch.clear()
+        # only rows whose batch has been committed count as consumed
+        with open(checkpoint_path, 'w') as file:
+            file.write(str(consumed))
+        rate = loaded / max(time.monotonic() - started, 1e-6)
+        click.echo(f'{consumed} rows read, {loaded} loaded, '
+                   f'{rejected} rejected ({rate:.0f} rows/s)')
+
+    with open(rejects_path, 'a') as rejects:
+        for number, row in enumerate(read_rows(path), 1):
+            if number <= skip:
+                continue
+            consumed = number
+            values, errors = validate_row(form_class, row)
+            if errors:
+                rejected += 1
+                rejects.write(json.dumps({'row': row, 'errors': errors}) + '\n')
+                continue
+            batch.append(values)
+            if len(batch) >= batch_size:
+                flush()
+        if batch or consumed:
+            flush()
+
+    _sync_id_sequence(model)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    elapsed = time.monotonic() - started
+    click.echo(f'Done: {loaded} loaded, {rejected} rejected in {elapsed:.1f}s '
+               f'({loaded / max(elapsed, 1e-6):.0f} rows/s)')
+    if rejected:
+        click.echo(f'Rejected rows written to {rejects_path}')
+
+
+#----------------------------------------------------------------------------#
+# Export.
+#----------------------------------------------------------------------------#
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'columns')
+
+# rows fetched per round trip and per columnar chunk
+EXPORT_BATCH_SIZE = 5000
+
+
+def export_columns(model):
+    return [column.key for column in model.__table__.columns
+            if column.key != 'search_vector']
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_row(row):
+    # genres ';' separated and booleans as the forms read them back
+    # (BooleanField takes any text but 'false' as true)
+    return [';'.join(value) if isinstance(value, list)
+            else ('true' if value else 'false') if isinstance(value, bool)
+            else _export_value(value) for value in row]
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_rows(model, format='ndjson', since_id=None, since=None):
+    '''
+    Yields `model`'s rows as chunks of text in `format`, read through a
+    server-side cursor so memory stays constant. `since_id` and `since`
+    restrict the export to rows after that id or updated after that time
+    (UTC).
+    '''
+    columns = export_columns(model)
+    query = db.session.query(*[getattr(model, column) for column in columns])
+    if since_id is not None:
+        query = query.filter(model.id > since_id)
+    if since is not None:
+        query = query.filter(model.updated_at > since)
+    rows = query.order_by(model.id).execution_options(
+        stream_results=True).yield_per(EXPORT_BATCH_SIZE)
+
+    if format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in _batches(rows, EXPORT_BATCH_SIZE):
+            for row in batch:
+                writer.writerow(csv_row(row))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    elif format == 'columns':
+        # one JSON object of column arrays per batch
+        for batch in _batches(rows, EXPORT_BATCH_SIZE):
+            yield json.dumps({column: [_export_value(row[index]) for row in batch]
+                              for index, column in enumerate(columns)}) + '\n'
+    else:
+        for row in rows:
+            yield json.dumps({column: _export_value(value)
+                              for column, value in zip(columns, row)}) + '\n'
+
+
+@catalog_cli.command('export')
+@click.argument('kind', type=click.Choice(sorted(MODELS)))
+@click.option('--format', 'format', type=click.Choice(EXPORT_FORMATS), default='ndjson', show_default=True)
+@click.option('--since-id', type=int, help='Only rows with a greater id.')
+@click.option('--since', type=click.DateTime(), help='Only rows updated after this UTC time.')
+@click.option('-o', '--output', type=click.File('w'), default='-')
+def export_command(kind, format, since_id, since, output):
+    """Write artists, venues or shows as CSV, NDJSON or column chunks."""
+    model, _ = MODELS[kind]
+    for chunk in export_rows(model, format, since_id, since):
+        output.write(chunk)
+
+
+#----------------------------------------------------------------------------#
+# Show counters.
+#----------------------------------------------------------------------------#
+
+
+@catalog_cli.command('refresh-counts')
+@click.option('--full', is_flag=True, help='Recompute every counter.')
+def refresh_counts_command(full):
+    """Move shows that have started from upcoming to past counts.
+
+    Meant to run periodically (e.g. from cron every few minutes); only
+    artists and venues with a show starting since the last run are
+    touched.
+    """
+    now = datetime.now()
+    watermark = Watermark.query.get('show_counts')
+    since = None if full or watermark is None else watermark.value
+    refresh_show_counts(now, since)
+    if watermark is None:
+        db.session.add(Watermark(name='show_counts', value=now))
+    else:
+        watermark.value = now
+    db.session.commit()
+    click.echo(f'Show counts refreshed up to {now.isoformat()}')
+
+
+#----------------------------------------------------------------------------#
+# Geocoding.
+#----------------------------------------------------------------------------#
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'data', 'gazetteer.csv')
+
+
+@catalog_cli.command('geocode')
+@click.option('--gazetteer', default=GAZETTEER_PATH, show_default=True,
+              type=click.Path(exists=True, dir_okay=False),
+              help='CSV of city, state, latitude, longitude.')
+@click.option('--all', 'everything', is_flag=True,
+              help='Also redo venues that already have coordinates.')
+@click.option('--batch-size', default=1000, show_default=True)
+def geocode_command(gazetteer, everything, batch_size):
+    """Set venue coordinates from a local gazetteer.
+
+    Venues are placed at the centre of their city; no network service is
+    used. Venues whose city is not in the gazetteer are left without
+    coordinates and so never appear in /venues/nearby.
+    """
+    places = geo.read_gazetteer(gazetteer)
+    # bind names must differ from the column names in an executemany update
+    update = Venue.__table__.update().where(Venue.id == bindparam('venue_id')).values(
+        latitude=bindparam('lat'), longitude=bindparam('lng'), geohash=bindparam('cell'))
+    located = unknown = 0
+    last_id = 0
+    while True:
+        query = db.session.query(Venue.id, Venue.city, Venue.state).filter(Venue.id > last_id)
+        if not everything:
+            query = query.filter(Venue.geohash.is_(None))
+        rows = query.order_by(Venue.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        batch = []
+        for id, city, state in rows:
+            place = places.get(geo.place_key(city, state))
+            if place is None:
+                unknown += 1
+                continue
+            latitude, longitude = place
+            batch.append({'venue_id': id, 'lat': latitude, 'lng': longitude,
+                          'cell': geo.encode(latitude, longitude)})
+        if batch:
+            db.session.execute(update, batch)
+        db.session.commit()
+        located += len(batch)
+    click.echo(f'{located} venues geocoded, {unknown} not in the gazetteer')
+
+
+#----------------------------------------------------------------------------#
+# Synthetic data.
+#----------------------------------------------------------------------------#
+
+
+@catalog_cli.command('seed')
+@click.option('--shows', 'show_count', default=1000, show_default=True,
+              help='Shows to generate, e.g. 1000 up to 10000000.')
+@click.option('--shows-per-artist', default=20, show_default=True)
+@click.option('--shows-per-venue', default=50, show_default=True)
+@click.option('--seed', type=int, help='Random seed for a repeatable data set.')
+@click.option('--batch-size', default=5000, show_default=True)
+def seed_command(show_count, shows_per_artist, shows_per_venue, seed, batch_size):
+    """Fill the database with synthetic artists, venues and shows."""
+    rng = synthetic.generator(seed)
+    started = time.monotonic()
+    ids = {}
+    for model, rows, count in (
+            (Artist, synthetic.artists, max(show_count // shows_per_artist, 1)),
+            (Venue, synthetic.venues, max(show_count // shows_per_venue, 1))):
+        first_id = (db.session.query(func.max(model.id)).scalar() or 0) + 1
+        for batch in _batches(rows(rng, first_id, count), batch_size):
+            db.session.execute(model.__table__.insert(), batch)
+            db.session.commit()
+        _sync_id_sequence(model)
+        ids[model] = range(first_id, first_id + count)
+        click.echo(f'{count} {model.__tablename__} rows')
+
+    inserted = 0
+    for batch in _batches(synthetic.shows(rng, ids[Artist], ids[Venue], show_count), batch_size):
+        db.session.execute(Show.__table__.insert(), batch)
+        db.session.commit()
+        inserted += len(batch)
+        click.echo(f'{inserted} shows ({inserted / (time.monotonic() - started):.0f} rows/s)')
+
+
+#----------------------------------------------------------------------------#
+# Query plans.
+#----------------------------------------------------------------------------#
+
+
+@catalog_cli.command('check-indexes')
+def check_indexes():
+    """Fail if a hot query plan falls back to a sequential scan."""
+    failed = False
+    for name, query in hot_queries():
+        tables = seq_scans(query)
+        if tables:
+            failed = True
+            click.echo(f'{name}: sequential scan on {", ".join(tables)}')
+    db.session.rollback()
+    if failed:
+        sys.exit(1)
+    click.echo('All hot queries use indexes')
@@ -0,0 +1,88 @@
+from sqlalchemy import func
+from models import db, Artist, Venue, FacetCount
+from queries import genre_counts
+
+#----------------------------------------------------------------------------#
+# Search facets.
+#----------------------------------------------------------------------------#
+
+# (facet, heading) in display order; ?<facet>=<value> selects one
+FACETS = (('state', 'State'), ('city', 'City'), ('genre', 'Genre'), ('seeking', None))
+
+SEEKING = {
+    Venue: ('seeking_talent', 'Seeking talent'),
+    Artist: ('seeking_venue', 'Seeking a venue'),
+}
+
+FACET_LIMIT = 10
+
+
+def selected_facets(args):
+    return {name: args[name] for name, _ in FACETS if args.get(name)}
+
+
+def facet_filters(model, selected):
+    # criteria for the selected facets, added to the search query
+    filters = []
+    if 'state' in selected:
+        filters.append(model.state == selected['state'])
+    if 'city' in selected:
+        filters.append(model.city == selected['city'])
+    if 'genre' in selected:
+        filters.append(model.genres.contains([selected['genre']]))
+    if selected.get('seeking') in ('true', 'false'):
+        column = getattr(model, SEEKING[model][0])
+        filters.append(column == (selected['seeking'] == 'true'))
+    return filters
+
+
+def facet_counts(model, state=None):
+    '''
+    Returns {facet: [(value, count)]} for `model` (Artist or Venue),
+    within one state when given. Every count is read from FacetCount or
+    GenreCount, which triggers keep current, so no query here touches the
+    Artist or Venue tables however large they grow.
+    '''
+    kind = model.__tablename__.lower()
+    base = db.session.query(FacetCount.value, func.sum(FacetCount.count)).filter(
+        FacetCount.kind == kind, FacetCount.value != '')
+    if state:
+        base = base.filter(FacetCount.state == state)
+
+    counts = {}
+    for facet, limit in (('state', None), ('city', FACET_LIMIT), ('seeking', None)):
+        total = func.sum(FacetCount.count)
+        query = base.filter(FacetCount.facet == facet).group_by(
+            FacetCount.value).having(total > 0).order_by(total.desc(), FacetCount.value)
+        counts[facet] = query.limit(limit).all()
+    counts['genre'] = genre_counts(kind, state)[:FACET_LIMIT]
+    return counts
+
+
+def facet_groups(model, counts, selected):
+    '''
+    Shapes `counts` for the search templates: one group per facet with its
+    heading and items, each item carrying the query arguments that toggle
+    it on or off while keeping the other selections.
+    '''
+    seeking_heading = SEEKING[model][1]
+    groups = []
+    for facet, heading in FACETS:
+        items = []
+        for value, count in counts[facet]:
+            active = selected.get(facet) == value
+            args = dict(selected)
+            if active:
+                del args[facet]
+            else:
+                args[facet] = value
+            if facet == 'state' and not active:
+                # a city picked in another state would match nothing
+                args.pop('city', None)
+            label = value
+            if facet == 'seeking':
+                label = 'Yes' if value == 'true' else 'No'
+            items.append({'label': label, 'count': count, 'active': active, 'args': args})
+        if items:
+            groups.append({'heading': heading or seeking_heading, 'items': items})
+    return groups
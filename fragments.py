@@ -0,0 +1,47 @@
+from jinja2 import nodes
+from jinja2.ext import Extension
+from cache import LRUCache
+
+#----------------------------------------------------------------------------#
+# Fragment cache.
+#----------------------------------------------------------------------------#
+
+
+class FragmentCacheExtension(Extension):
+    '''
+    {% cache key, ttl %}...{% endcache %} renders the block once per key
+    and serves it from an in-process LRU until `ttl` seconds pass (the
+    store's default when omitted). Build keys from entity ids and their
+    updated_at so an edit only re-renders the fragments it touches.
+    '''
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super(FragmentCacheExtension, self).__init__(environment)
+        environment.extend(fragment_cache=LRUCache(max_entries=4096, ttl=3600))
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_cache', args), [], [], body).set_lineno(lineno)
+
+    def _cache(self, key, ttl, caller):
+        fragment_cache = self.environment.fragment_cache
+        fragment = fragment_cache.get(key)
+        if fragment is None:
+            fragment = caller()
+            fragment_cache.set(key, fragment, ttl)
+        return fragment
+
+
+def init_fragment_cache(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache = LRUCache(
+        app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', 4096),
+        ttl=app.config.get('FRAGMENT_CACHE_TTL', 3600))
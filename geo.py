@@ -0,0 +1,94 @@
+import csv
+import math
+
+#----------------------------------------------------------------------------#
+# Geohash grid.
+#----------------------------------------------------------------------------#
+
+# Venues are bucketed by geohash: nearby points share a prefix, so the
+# venues in one grid cell are a single index range (LIKE 'prefix%').
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        # bits alternate longitude, latitude, starting with longitude
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    # (latitude, longitude) span of one cell in degrees
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def covering_cells(latitude, longitude, radius_km):
+    '''
+    Returns the geohash prefixes of the 3x3 block of cells around a point,
+    at the finest precision whose cells are at least `radius_km` across,
+    so together they cover every point within the radius.
+    '''
+    # cells narrow towards the poles, so measure at the circle's edge
+    edge_latitude = min(abs(latitude) + radius_km / KM_PER_DEGREE, 90.0)
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        lat_span, lng_span = cell_size(candidate)
+        width_km = lng_span * KM_PER_DEGREE * math.cos(math.radians(edge_latitude))
+        if lat_span * KM_PER_DEGREE >= radius_km and width_km >= radius_km:
+            precision = candidate
+            break
+    lat_span, lng_span = cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        for lng_step in (-1, 0, 1):
+            lat = min(max(latitude + lat_step * lat_span, -90.0), 90.0)
+            lng = (longitude + lng_step * lng_span + 180.0) % 360.0 - 180.0
+            cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    # haversine great-circle distance
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+#----------------------------------------------------------------------------#
+# Gazetteer.
+#----------------------------------------------------------------------------#
+
+
+def place_key(city, state):
+    return ' '.join((city or '').casefold().split()), (state or '').upper()
+
+
+def read_gazetteer(path):
+    # CSV with city, state, latitude, longitude columns
+    places = {}
+    with open(path, newline='') as file:
+        for row in csv.DictReader(file):
+            places[place_key(row['city'], row['state'])] = (
+                float(row['latitude']), float(row['longitude']))
+    return places
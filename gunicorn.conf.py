@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+
+# Pre-fork workers, each with a few threads for requests waiting on the
+# database. Every worker has its own DB pool, so keep
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below max_connections.
+bind = os.environ.get('BIND', '0.0.0.0:' + os.environ.get('PORT', '8000'))
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread'
+timeout = 30
+keepalive = 5
+
+# Graceful reloads: `kill -HUP <master pid>` starts new workers with fresh
+# code and lets the old ones finish in-flight requests first.
+graceful_timeout = 30
+# Recycle workers now and then to bound memory growth, staggered so
+# they do not all restart together.
+max_requests = 5000
+max_requests_jitter = 500
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_worker_init(worker):
+    # build the autocomplete index before the worker takes requests, then
+    # keep it current from a background thread; on failure the thread
+    # retries every AUTOCOMPLETE_REFRESH_SECONDS
+    from autocomplete import name_index
+    try:
+        with worker.wsgi.app_context():
+            name_index.refresh()
+    except Exception:
+        worker.log.exception('Could not build the autocomplete index')
+    name_index.start(worker.wsgi)
+
+
+def child_exit(server, worker):
+    # drop the dead worker's live gauges from the /metrics aggregation
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, request, session, make_response
+from sqlalchemy import func
+from models import db, Watermark
+
+#----------------------------------------------------------------------------#
+# HTTP caching.
+#----------------------------------------------------------------------------#
+
+
+def _validators(models):
+    # newest updated_at of each model plus the watermarks (show counter
+    # refreshes, venue deletes) in one round trip; every max() is an
+    # index lookup on updated_at
+    columns = [db.session.query(func.max(model.updated_at)).as_scalar()
+               for model in models]
+    row = db.session.query(*columns).one() if columns else ()
+    last_modified = max([value for value in row if value is not None], default=None)
+    watermarks = db.session.query(Watermark.name, Watermark.value).order_by(
+        Watermark.name).all()
+    return last_modified, watermarks
+
+
+def current_window(step):
+    '''
+    datetime.now() rounded down to a multiple of `step` (a timedelta).
+    Views whose content depends on the time use it as "now", and pass the
+    same step to conditional() so no 304 outlives the window.
+    '''
+    now = datetime.now()
+    return now - (now - datetime.min) % step
+
+
+def conditional(*models, step=None):
+    '''
+    Adds ETag, Last-Modified and Cache-Control to a GET page built from
+    `models`, and answers a matching conditional request with 304 without
+    running the view. Pages carrying flashed messages are never cached.
+    With `step`, the validators also change whenever current_window(step)
+    moves, even without writes.
+    '''
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if session.get('_flashes'):
+                response = make_response(view(*args, **kwargs))
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+                return response
+
+            last_modified, watermarks = _validators(models)
+            if last_modified is not None:
+                last_modified = last_modified.replace(
+                    microsecond=0, tzinfo=timezone.utc)
+            window = current_window(step) if step is not None else None
+            if window is not None:
+                # the window moving changes the page like a write would
+                moved = window.astimezone(timezone.utc)
+                last_modified = max(last_modified or moved, moved)
+            etag = hashlib.md5(repr((
+                request.endpoint, sorted(request.view_args.items()),
+                sorted(request.args.items(multi=True)),
+                last_modified, watermarks, window,
+            )).encode('utf-8')).hexdigest()
+
+            if request.if_none_match.contains(etag) or (
+                    not request.if_none_match and last_modified is not None and
+                    request.if_modified_since is not None and
+                    request.if_modified_since >= last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # browsers revalidate every time, so a page seen before an edit
+            # is never shown after it; shared caches (no-cache would bind
+            # them too) may reuse it for s-maxage seconds
+            response.cache_control.public = True
+            response.cache_control.max_age = 0
+            response.cache_control.s_maxage = current_app.config.get(
+                'CACHE_CONTROL_MAX_AGE', 60)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,144 @@
+'''
+Load-test harness: starts the app under a serving mode, hits a set of
+paths from concurrent clients and reports throughput and latency.
+
+    python loadtest.py --mode gunicorn --mode asgi --paths /shows /venues
+    python loadtest.py --mode gunicorn --concurrency 8 64 --check
+
+Modes: dev (Flask development server), gunicorn (gunicorn.conf.py),
+asgi (uvicorn + asgi.py). --url tests an already running server instead.
+
+With several --concurrency levels, --check exits 1 if any request
+failed (an exhausted connection pool surfaces as 500s after
+DB_POOL_TIMEOUT) or if throughput at the highest level falls below
+--min-scaling times the lowest one.
+'''
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = {
+    'dev': lambda port: [sys.executable, 'app.py'],
+    'gunicorn': lambda port: ['gunicorn', '-c', 'gunicorn.conf.py',
+                              '-b', f'127.0.0.1:{port}', 'wsgi:app'],
+    'asgi': lambda port: ['uvicorn', '--port', str(port), '--workers',
+                          str(os.cpu_count() * 2 + 1), 'asgi:application'],
+}
+
+
+def percentile(values, fraction):
+    index = min(int(len(values) * fraction), len(values) - 1)
+    return values[index]
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up within {timeout}s')
+
+
+def fetch(url):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            ok = response.status < 400
+    except OSError:
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def run(base_url, path, requests, concurrency):
+    url = base_url + path
+    # warm caches and connection pools before measuring
+    for _ in range(concurrency):
+        fetch(url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(fetch, [url] * requests))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        'path': path,
+        'requests': requests,
+        'errors': sum(1 for _, ok in results if not ok),
+        'rps': requests / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def problems(mode, results, min_scaling):
+    # failed requests, and throughput that drops as concurrency rises
+    for result in results:
+        if result['errors']:
+            yield f"{mode} {result['path']}: {result['errors']} failed requests"
+    first, last = results[0], results[-1]
+    if last['rps'] < first['rps'] * min_scaling:
+        yield (f"{mode} {first['path']}: {last['rps']:.1f} req/s under load, "
+               f"below {min_scaling:.0%} of {first['rps']:.1f} req/s")
+
+
+def report(mode, result):
+    print(f"{mode:<14} {result['path']:<12} {result['rps']:>9.1f} req/s  "
+          f"p50 {result['p50_ms']:>8.1f} ms  p99 {result['p99_ms']:>8.1f} ms  "
+          f"errors {result['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', action='append', choices=sorted(MODES))
+    parser.add_argument('--url', help='Test a running server instead.')
+    parser.add_argument('--paths', nargs='+', default=['/shows', '/venues'])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[32])
+    parser.add_argument('--check', action='store_true',
+                        help='Exit 1 on errors or throughput collapsing under load.')
+    parser.add_argument('--min-scaling', type=float, default=0.8)
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    failures = []
+
+    def run_levels(mode, base_url):
+        for path in args.paths:
+            results = []
+            for concurrency in args.concurrency:
+                result = run(base_url, path, args.requests, concurrency)
+                report(f'{mode} x{concurrency}', result)
+                results.append(result)
+            failures.extend(problems(mode, results, args.min_scaling))
+
+    if args.url:
+        run_levels('external', args.url.rstrip('/'))
+    else:
+        for mode in args.mode or sorted(MODES):
+            env = dict(os.environ, PORT=str(args.port), FYYUR_ENV=os.environ.get(
+                'FYYUR_ENV', 'production'))
+            server = subprocess.Popen(MODES[mode](args.port), env=env)
+            base_url = f'http://127.0.0.1:{args.port}'
+            try:
+                wait_until_up(base_url + '/')
+                run_levels(mode, base_url)
+            finally:
+                server.terminate()
+                server.wait()
+
+    for failure in failures:
+        print('FAIL ' + failure)
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
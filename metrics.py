@@ -0,0 +1,94 @@
+import os
+import time
+from flask import Response, current_app, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry,
+                               Counter, Gauge, Histogram, generate_latest, multiprocess)
+
+#----------------------------------------------------------------------------#
+# Prometheus metrics.
+#----------------------------------------------------------------------------#
+
+# With PROMETHEUS_MULTIPROC_DIR set (required under a pre-fork server)
+# every worker writes its samples to files there and /metrics sums them.
+
+REQUEST_LATENCY = Histogram(
+    'fyyur_request_latency_seconds', 'Request latency by Flask endpoint.',
+    ['endpoint', 'method'],
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10))
+FAILED_COMMITS = Counter(
+    'fyyur_failed_commits_total', 'Rolled back commits by Flask endpoint.',
+    ['endpoint'])
+POOL_CHECKED_OUT = Gauge(
+    'fyyur_db_pool_checked_out', 'Database connections in use.',
+    multiprocess_mode='livesum')
+POOL_OVERFLOW = Gauge(
+    'fyyur_db_pool_overflow', 'Database connections opened beyond pool_size.',
+    multiprocess_mode='livesum')
+CACHE_LOOKUPS = Counter(
+    'fyyur_cache_lookups_total', 'Cache lookups by cache and result.',
+    ['cache', 'result'])
+
+
+def failed_commit():
+    # called from a handler's except block, after the rollback
+    FAILED_COMMITS.labels(endpoint=request.endpoint).inc()
+    current_app.logger.exception('Commit failed in %s', request.endpoint)
+
+
+class Metrics(object):
+
+    def __init__(self, app=None):
+        self._exported = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def _start(self):
+        g.metrics_started = time.perf_counter()
+
+    def _finish(self, response):
+        started = g.pop('metrics_started', None)
+        if started is not None and request.endpoint not in (None, 'static', 'metrics'):
+            REQUEST_LATENCY.labels(request.endpoint, request.method).observe(
+                time.perf_counter() - started)
+            self._collect()
+        return response
+
+    def _cache_backends(self):
+        from cache import cache
+        yield 'views', cache.backend
+        fragment_cache = getattr(self.app.jinja_env, 'fragment_cache', None)
+        if fragment_cache is not None:
+            yield 'fragments', fragment_cache
+
+    def _collect(self):
+        # refreshed after each request by the worker that served it, so
+        # every worker's values reach the multiprocess files
+        from models import db
+        pool = db.engine.pool
+        if hasattr(pool, 'checkedout'):
+            POOL_CHECKED_OUT.set(pool.checkedout())
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+        # cache counters are plain ints on the backends; export the growth
+        for name, backend in self._cache_backends():
+            for result, value in (('hit', backend.hits), ('miss', backend.misses)):
+                last = self._exported.get((name, result), 0)
+                if value > last:
+                    CACHE_LOOKUPS.labels(name, result).inc(value - last)
+                self._exported[(name, result)] = value
+
+    def metrics_view(self):
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+metrics = Metrics()
@@ -0,0 +1,71 @@
+"""add genre indexes and per-genre counts
+
+Revision ID: 3e8b5d0c27a4
+Revises: 9f54bc2e447f
+Create Date: 2026-10-18 13:07:42.581906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e8b5d0c27a4'
+down_revision = '9f54bc2e447f'
+branch_labels = None
+depends_on = None
+
+KINDS = (('artist', 'Artist'), ('venue', 'Venue'))
+
+
+def upgrade():
+    op.create_table('GenreCount',
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('state', sa.String(length=120), nullable=False),
+    sa.Column('genre', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'state', 'genre')
+    )
+    for kind, table in KINDS:
+        op.create_index(f'ix_{kind}_genres', table, ['genres'], unique=False,
+                        postgresql_using='gin')
+        op.execute(f"""
+            INSERT INTO "GenreCount" (kind, state, genre, count)
+            SELECT '{kind}', coalesce(state, ''), genre, count(DISTINCT id)
+            FROM "{table}", unnest(genres) AS genre
+            GROUP BY coalesce(state, ''), genre
+        """)
+    # TG_ARGV[0] is the kind; a genre listed twice on one row counts once
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fyyur_genre_counts_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE "GenreCount" SET count = count - 1
+                WHERE kind = TG_ARGV[0] AND state = coalesce(OLD.state, '')
+                    AND genre = ANY(OLD.genres);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO "GenreCount" (kind, state, genre, count)
+                SELECT DISTINCT TG_ARGV[0], coalesce(NEW.state, ''), genre, 1
+                FROM unnest(NEW.genres) AS genre
+                ON CONFLICT (kind, state, genre)
+                DO UPDATE SET count = "GenreCount".count + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for kind, table in KINDS:
+        op.execute(f"""
+            CREATE TRIGGER "{table}_genre_counts_update"
+            AFTER INSERT OR DELETE OR UPDATE OF genres, state ON "{table}"
+            FOR EACH ROW EXECUTE PROCEDURE fyyur_genre_counts_update('{kind}')
+        """)
+
+
+def downgrade():
+    for kind, table in KINDS:
+        op.execute(f'DROP TRIGGER "{table}_genre_counts_update" ON "{table}"')
+        op.drop_index(f'ix_{kind}_genres', table_name=table)
+    op.execute('DROP FUNCTION fyyur_genre_counts_update()')
+    op.drop_table('GenreCount')
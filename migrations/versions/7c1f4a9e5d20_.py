@@ -0,0 +1,78 @@
+"""add facet counts for search
+
+Revision ID: 7c1f4a9e5d20
+Revises: 3e8b5d0c27a4
+Create Date: 2026-10-18 13:48:19.220417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1f4a9e5d20'
+down_revision = '3e8b5d0c27a4'
+branch_labels = None
+depends_on = None
+
+# (kind, table, seeking column)
+KINDS = (('artist', 'Artist', 'seeking_venue'), ('venue', 'Venue', 'seeking_talent'))
+
+# the facet rows one Artist/Venue row counts towards
+FACET_VALUES = """
+    (VALUES ('state', {row}.state::text), ('city', {row}.city::text),
+            ('seeking', to_jsonb({row})->>{seeking})) AS facet_value(facet, value)
+"""
+
+
+def upgrade():
+    op.create_table('FacetCount',
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('facet', sa.String(length=16), nullable=False),
+    sa.Column('state', sa.String(length=120), nullable=False),
+    sa.Column('value', sa.String(length=120), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'facet', 'state', 'value')
+    )
+    for kind, table, seeking in KINDS:
+        op.execute(f"""
+            INSERT INTO "FacetCount" (kind, facet, state, value, count)
+            SELECT '{kind}', facet, coalesce(state, ''), coalesce(value, ''), count(*)
+            FROM "{table}", LATERAL {FACET_VALUES.format(row=f'"{table}"', seeking=f"'{seeking}'")}
+            GROUP BY facet, coalesce(state, ''), coalesce(value, '')
+        """)
+    # TG_ARGV[0] is the kind, TG_ARGV[1] the seeking column
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION fyyur_facet_counts_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE "FacetCount" SET count = count - 1
+                FROM {FACET_VALUES.format(row='OLD', seeking='TG_ARGV[1]')}
+                WHERE kind = TG_ARGV[0] AND "FacetCount".facet = facet_value.facet
+                    AND state = coalesce(OLD.state, '')
+                    AND "FacetCount".value = coalesce(facet_value.value, '');
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO "FacetCount" (kind, facet, state, value, count)
+                SELECT TG_ARGV[0], facet, coalesce(NEW.state, ''), coalesce(value, ''), 1
+                FROM {FACET_VALUES.format(row='NEW', seeking='TG_ARGV[1]')}
+                ON CONFLICT (kind, facet, state, value)
+                DO UPDATE SET count = "FacetCount".count + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for kind, table, seeking in KINDS:
+        op.execute(f"""
+            CREATE TRIGGER "{table}_facet_counts_update"
+            AFTER INSERT OR DELETE OR UPDATE OF state, city, {seeking} ON "{table}"
+            FOR EACH ROW EXECUTE PROCEDURE fyyur_facet_counts_update('{kind}', '{seeking}')
+        """)
+
+
+def downgrade():
+    for kind, table, seeking in KINDS:
+        op.execute(f'DROP TRIGGER "{table}_facet_counts_update" ON "{table}"')
+    op.execute('DROP FUNCTION fyyur_facet_counts_update()')
+    op.drop_table('FacetCount')
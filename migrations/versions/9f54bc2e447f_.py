@@ -0,0 +1,29 @@
+"""add updated_at to artist, venue and show
+
+Revision ID: 9f54bc2e447f
+Revises: fed93b1c64bf
+Create Date: 2026-10-18 12:21:53.907114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f54bc2e447f'
+down_revision = 'fed93b1c64bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('Artist', 'Venue', 'Show'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                       server_default=sa.text("timezone('utc', now())")))
+        op.create_index(f'ix_{table.lower()}_updated_at', table, ['updated_at'], unique=False)
+
+
+def downgrade():
+    for table in ('Show', 'Venue', 'Artist'):
+        op.drop_index(f'ix_{table.lower()}_updated_at', table_name=table)
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,59 @@
+"""add search vectors and trigram indexes
+
+Revision ID: c587c3fa8f17
+Revises: f5c1e916f922
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c587c3fa8f17'
+down_revision = 'f5c1e916f922'
+branch_labels = None
+depends_on = None
+
+# name weighs most, then location, then genres
+SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(NEW.city, '') || ' ' || coalesce(NEW.state, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(array_to_string(NEW.genres, ' '), '')), 'C')
+"""
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION fyyur_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('Artist', 'Venue'):
+        op.add_column(table, sa.Column(
+            'search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(f"""
+            CREATE TRIGGER "{table}_search_vector_update"
+            BEFORE INSERT OR UPDATE ON "{table}"
+            FOR EACH ROW EXECUTE PROCEDURE fyyur_search_vector_update()
+        """)
+        # fire the trigger once to backfill existing rows
+        op.execute(f'UPDATE "{table}" SET name = name')
+        op.create_index(f'ix_{table.lower()}_search_vector', table,
+                        ['search_vector'], postgresql_using='gin')
+        op.create_index(f'ix_{table.lower()}_name_trgm', table, ['name'],
+                        postgresql_using='gin',
+                        postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    for table in ('Venue', 'Artist'):
+        op.drop_index(f'ix_{table.lower()}_name_trgm', table_name=table)
+        op.drop_index(f'ix_{table.lower()}_search_vector', table_name=table)
+        op.execute(f'DROP TRIGGER "{table}_search_vector_update" ON "{table}"')
+        op.drop_column(table, 'search_vector')
+    op.execute('DROP FUNCTION fyyur_search_vector_update()')
@@ -0,0 +1,24 @@
+"""add show start_time index for time windows
+
+Revision ID: d6a3e18f4b95
+Revises: b2d94f7a1e6c
+Create Date: 2026-10-18 15:02:37.904126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6a3e18f4b95'
+down_revision = 'b2d94f7a1e6c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_show_start_time_id', 'Show', ['start_time', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_show_start_time_id', table_name='Show')
@@ -0,0 +1,58 @@
+"""bump updated_at when show counters change
+
+Revision ID: e41c7b2d9a58
+Revises: d6a3e18f4b95
+Create Date: 2026-10-18 16:10:52.731840
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41c7b2d9a58'
+down_revision = 'd6a3e18f4b95'
+branch_labels = None
+depends_on = None
+
+# adds `sign` (+1 or -1) to the counters of the show's artist and venue;
+# {touch} also moves updated_at, so page validators and since= exports
+# see the new counts
+COUNT_SHOW = """
+        UPDATE "{table}" SET
+            upcoming_shows_count = upcoming_shows_count + {sign} * coalesce(({row}.start_time >= LOCALTIMESTAMP)::int, 0),
+            past_shows_count = past_shows_count + {sign} * coalesce(({row}.start_time < LOCALTIMESTAMP)::int, 0){touch}
+        WHERE id = {row}.{column};
+"""
+
+TOUCH = """,
+            updated_at = timezone('utc', now())"""
+
+
+def _count_show(row, sign, touch):
+    return ''.join(COUNT_SHOW.format(table=table, column=column, row=row, sign=sign,
+                                     touch=TOUCH if touch else '')
+                   for table, column in (('Venue', 'venue_id'), ('Artist', 'artist_id')))
+
+
+def _replace_function(touch):
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION fyyur_show_counts_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {_count_show('OLD', -1, touch)}
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {_count_show('NEW', 1, touch)}
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def upgrade():
+    _replace_function(touch=True)
+
+
+def downgrade():
+    _replace_function(touch=False)
@@ -0,0 +1,28 @@
+"""add view cache versions
+
+Revision ID: f8b3a6d0c217
+Revises: e41c7b2d9a58
+Create Date: 2026-10-18 16:34:18.052391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8b3a6d0c217'
+down_revision = 'e41c7b2d9a58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('CacheVersion',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('CacheVersion')
@@ -0,0 +1,74 @@
+"""add show counters to artist and venue
+
+Revision ID: fed93b1c64bf
+Revises: f0779327946a
+Create Date: 2026-10-18 11:40:06.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fed93b1c64bf'
+down_revision = 'f0779327946a'
+branch_labels = None
+depends_on = None
+
+# adds `sign` (+1 or -1) to the counters of the show's artist and venue
+COUNT_SHOW = """
+        UPDATE "{table}" SET
+            upcoming_shows_count = upcoming_shows_count + {sign} * coalesce(({row}.start_time >= LOCALTIMESTAMP)::int, 0),
+            past_shows_count = past_shows_count + {sign} * coalesce(({row}.start_time < LOCALTIMESTAMP)::int, 0)
+        WHERE id = {row}.{column};
+"""
+
+
+def _count_show(row, sign):
+    return ''.join(COUNT_SHOW.format(table=table, column=column, row=row, sign=sign)
+                   for table, column in (('Venue', 'venue_id'), ('Artist', 'artist_id')))
+
+
+def upgrade():
+    op.create_table('Watermark',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    for table, column in (('Venue', 'venue_id'), ('Artist', 'artist_id')):
+        op.add_column(table, sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('past_shows_count', sa.Integer(), server_default='0', nullable=False))
+        op.execute(f"""
+            UPDATE "{table}" SET
+                upcoming_shows_count = (SELECT count(*) FROM "Show"
+                    WHERE "Show".{column} = "{table}".id AND start_time >= LOCALTIMESTAMP),
+                past_shows_count = (SELECT count(*) FROM "Show"
+                    WHERE "Show".{column} = "{table}".id AND start_time < LOCALTIMESTAMP)
+        """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION fyyur_show_counts_update() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {_count_show('OLD', -1)}
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {_count_show('NEW', 1)}
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER "Show_counts_update"
+        AFTER INSERT OR DELETE OR UPDATE OF start_time, artist_id, venue_id ON "Show"
+        FOR EACH ROW EXECUTE PROCEDURE fyyur_show_counts_update()
+    """)
+
+
+def downgrade():
+    op.execute('DROP TRIGGER "Show_counts_update" ON "Show"')
+    op.execute('DROP FUNCTION fyyur_show_counts_update()')
+    for table in ('Artist', 'Venue'):
+        op.drop_column(table, 'past_shows_count')
+        op.drop_column(table, 'upcoming_shows_count')
+    op.drop_table('Watermark')
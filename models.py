@@ -1,7 +1,26 @@
-from sqlalchemy.dialects.postgresql import ARRAY
-from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy import SignallingSession
+from sqlalchemy import event, func
+from datetime import datetime
+from routing import RoutingSQLAlchemy
 
-db = SQLAlchemy()
+db = RoutingSQLAlchemy()
+
+
+@event.listens_for(SignallingSession, 'after_begin')
+def set_statement_timeout(session, transaction, connection):
+    # a view may set g.statement_timeout (ms, 0 for none) to override
+    # STATEMENT_TIMEOUT_MS; behind PgBouncer the default is applied here
+    # too, since connection startup options are not available there
+    if not has_app_context() or connection.dialect.name != 'postgresql':
+        return
+    timeout = g.get('statement_timeout')
+    if timeout is None and current_app.config.get('PGBOUNCER'):
+        timeout = current_app.config.get('STATEMENT_TIMEOUT_MS')
+    if timeout is not None:
+        connection.execute(f'SET LOCAL statement_timeout = {int(timeout)}')
 
 #----------------------------------------------------------------------------#
 # Models.
@@ -10,6 +29,17 @@ db = SQLAlchemy()
 
 class Venue(db.Model):
     __tablename__ = 'Venue'
+    __table_args__ = (
+        db.Index('ix_venue_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_venue_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_venue_state_city_id', 'state', 'city', 'id'),
+        db.Index('ix_venue_updated_at', 'updated_at'),
+        db.Index('ix_venue_genres', 'genres', postgresql_using='gin'),
+        # pattern ops so LIKE 'prefix%' is an index range scan
+        db.Index('ix_venue_geohash', 'geohash',
+                 postgresql_ops={'geohash': 'varchar_pattern_ops'}),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String)
@@ -24,10 +54,32 @@ class Venue(db.Model):
     seeking_talent = db.Column(db.Boolean, nullable=False, default=False)
     seeking_description = db.Column(db.String())
     shows = db.relationship('Show', backref='venue_show_list', lazy=True)
+    # kept current by a trigger on Show and `flask catalog refresh-counts`
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow,
+                           onupdate=datetime.utcnow,
+                           server_default=func.timezone('utc', func.now()))
+    # set by `flask catalog geocode`; the geohash places the venue in the
+    # grid /venues/nearby searches
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12))
+    # maintained by a trigger, see migration c587c3fa8f17
+    search_vector = deferred(db.Column(TSVECTOR))
 
 
 class Artist(db.Model):
     __tablename__ = 'Artist'
+    __table_args__ = (
+        db.Index('ix_artist_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_artist_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_artist_updated_at', 'updated_at'),
+        db.Index('ix_artist_genres', 'genres', postgresql_using='gin'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String)
@@ -41,10 +93,27 @@ class Artist(db.Model):
     seeking_venue = db.Column(db.Boolean, nullable=False, default=False)
     seeking_description = db.Column(db.String())
     shows = db.relationship('Show', backref='artist_show_list', lazy=True)
+    # kept current by a trigger on Show and `flask catalog refresh-counts`
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow,
+                           onupdate=datetime.utcnow,
+                           server_default=func.timezone('utc', func.now()))
+    # maintained by a trigger, see migration c587c3fa8f17
+    search_vector = deferred(db.Column(TSVECTOR))
 
 
 class Show(db.Model):
     __tablename__ = 'Show'
+    __table_args__ = (
+        db.Index('ix_show_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_show_artist_id_start_time', 'artist_id', 'start_time'),
+        db.Index('ix_show_updated_at', 'updated_at'),
+        # time windows and /shows keyset pages are range scans on this
+        db.Index('ix_show_start_time_id', 'start_time', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     start_time = db.Column(db.DateTime())
@@ -52,3 +121,48 @@ class Show(db.Model):
         'Artist.id'), nullable=False)
     venue_id = db.Column(db.Integer, db.ForeignKey(
         'Venue.id'), nullable=False)
+    updated_at = db.Column(db.DateTime(), nullable=False, default=datetime.utcnow,
+                           onupdate=datetime.utcnow,
+                           server_default=func.timezone('utc', func.now()))
+
+
+class Watermark(db.Model):
+    # last time a periodic job ran, by job name
+    __tablename__ = 'Watermark'
+
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.DateTime(), nullable=False)
+
+
+class GenreCount(db.Model):
+    # artists or venues (`kind`) listing a genre, per state ('' when the
+    # state is unset); kept current by triggers on Artist and Venue, see
+    # migration 3e8b5d0c27a4
+    __tablename__ = 'GenreCount'
+
+    kind = db.Column(db.String(16), primary_key=True)
+    state = db.Column(db.String(120), primary_key=True)
+    genre = db.Column(db.String(), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class FacetCount(db.Model):
+    # artists or venues (`kind`) per state, city and seeking flag, by state
+    # ('' when unset); kept current by triggers on Artist and Venue, see
+    # migration 7c1f4a9e5d20
+    __tablename__ = 'FacetCount'
+
+    kind = db.Column(db.String(16), primary_key=True)
+    facet = db.Column(db.String(16), primary_key=True)
+    state = db.Column(db.String(120), primary_key=True)
+    value = db.Column(db.String(120), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class CacheVersion(db.Model):
+    # bumped by cache.invalidate() in the writing transaction, so each
+    # worker's in-process view cache can tell its entries are stale
+    __tablename__ = 'CacheVersion'
+
+    key = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,102 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import tuple_, BigInteger, DateTime, Integer, String
+
+#----------------------------------------------------------------------------#
+# Keyset pagination.
+#----------------------------------------------------------------------------#
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Postgres integer range; a larger cursor value would fail in the database
+MAX_INTEGER = 2 ** 31 - 1
+
+
+def page_size():
+    # ?limit= is clamped so a client cannot ask for the whole table
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return min(max(limit, 1), MAX_PAGE_SIZE)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _coerce(column, value):
+    # cursors come from the client, so every value is checked against its
+    # column's type; raises TypeError or ValueError when it does not fit
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        if not isinstance(value, str):
+            raise TypeError('expected an ISO datetime for %s' % column.key)
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Integer):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise TypeError('expected an integer for %s' % column.key)
+        if not isinstance(column.type, BigInteger) and abs(value) > MAX_INTEGER:
+            raise ValueError('integer out of range for %s' % column.key)
+        return value
+    if isinstance(column.type, String):
+        if not isinstance(value, str):
+            raise TypeError('expected a string for %s' % column.key)
+        if '\x00' in value:
+            raise ValueError('NUL character in %s' % column.key)
+    return value
+
+
+def _cursor_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def after(columns, values, descending=False):
+    # row-value comparison (c1, c2, ...) > (v1, v2, ...), which Postgres
+    # turns into an index range scan on a matching composite index; a
+    # descending page scans the same index backwards with <
+    values = [_coerce(column, value) for column, value in zip(columns, values)]
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+
+def paginate(query, columns, key, descending=False):
+    '''
+    Returns one page of `query` ordered by `columns` and the cursor for the
+    next page (None on the last page). `key` maps a row to the values of
+    `columns` for that row. Every page is a range scan from the cursor, so
+    deep pages cost the same as the first one. A malformed cursor is
+    ignored and the first page is returned. With `descending` the pages
+    run from the last row back to the first.
+    '''
+    limit = page_size()
+    cursor = decode_cursor(request.args.get('after'))
+    if cursor is not None and len(cursor) == len(columns):
+        try:
+            query = query.filter(after(columns, cursor, descending))
+        except (ValueError, TypeError):
+            pass
+
+    order = [column.desc() for column in columns] if descending else columns
+    rows = query.order_by(*order).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([_cursor_value(v) for v in key(rows[-1])])
+    return rows, next_cursor
@@ -0,0 +1,138 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from flask import g, has_request_context, render_template, request
+from flask.signals import before_render_template, template_rendered, signals_available
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+#----------------------------------------------------------------------------#
+# Request profiling.
+#----------------------------------------------------------------------------#
+
+logger = logging.getLogger('fyyur.profile')
+
+# literal values and IN lists are folded so repeated lookups share a shape
+_NUMBER = re.compile(r'\b\d+\b')
+_IN_LIST = re.compile(r'IN \([^)]*\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    shape = _IN_LIST.sub('IN (...)', statement)
+    shape = _NUMBER.sub('?', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+def _profile():
+    return g.get('profile') if has_request_context() else None
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile() is not None:
+        conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile()
+    if profile is None or not conn.info.get('profile_started'):
+        return
+    profile['db_time'] += time.perf_counter() - conn.info['profile_started'].pop()
+    profile['queries'] += 1
+    profile['shapes'][statement_shape(statement)] += 1
+
+
+def _before_render(app, template, context, **extra):
+    profile = _profile()
+    if profile is not None:
+        profile['render_started'] = time.perf_counter()
+
+
+def _after_render(app, template, context, **extra):
+    profile = _profile()
+    if profile is not None and 'render_started' in profile:
+        profile['template_time'] += time.perf_counter() - profile.pop('render_started')
+
+
+class Profiler(object):
+    '''
+    Times a sample of requests (PROFILING_SAMPLE_RATE) when PROFILING is
+    on: total, database and template time, query count and statement
+    shapes repeated at least PROFILING_N_PLUS_ONE times, the usual sign of
+    an N+1 query. Each profile is logged as JSON to 'fyyur.profile'; the
+    most recent ones are listed at /__profile when PROFILING_PAGE is set.
+    '''
+
+    def __init__(self, app=None):
+        self.history = deque()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('PROFILING'):
+            return
+        self.sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 1.0)
+        self.n_plus_one = app.config.get('PROFILING_N_PLUS_ONE', 5)
+        self.history = deque(maxlen=app.config.get('PROFILING_HISTORY', 100))
+        if not logger.handlers:
+            # one JSON document per line for log shippers
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        if signals_available:
+            before_render_template.connect(_before_render, app)
+            template_rendered.connect(_after_render, app)
+        if app.config.get('PROFILING_PAGE'):
+            app.add_url_rule('/__profile', 'profile', self.profile_page)
+
+    def _start(self):
+        if random.random() < self.sample_rate:
+            g.profile = {
+                'started': time.perf_counter(),
+                'db_time': 0.0,
+                'template_time': 0.0,
+                'queries': 0,
+                'shapes': Counter(),
+            }
+
+    def _finish(self, response):
+        profile = g.pop('profile', None)
+        if profile is None or request.endpoint == 'profile':
+            return response
+        record = {
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'total_ms': round((time.perf_counter() - profile['started']) * 1000, 2),
+            'db_ms': round(profile['db_time'] * 1000, 2),
+            'template_ms': round(profile['template_time'] * 1000, 2),
+            'queries': profile['queries'],
+            'n_plus_one': [
+                {'statement': shape, 'count': count}
+                for shape, count in profile['shapes'].most_common()
+                if count >= self.n_plus_one
+            ],
+        }
+        logger.info(json.dumps(record))
+        with self._lock:
+            self.history.appendleft(record)
+        return response
+
+    def profile_page(self):
+        with self._lock:
+            profiles = list(self.history)
+        return render_template('pages/profile.html', profiles=profiles)
+
+
+profiler = Profiler()
@@ -0,0 +1,221 @@
+from datetime import datetime
+from sqlalchemy import func, or_
+from models import db, Artist, Venue, Show, GenreCount
+from pagination import after
+import geo
+
+#----------------------------------------------------------------------------#
+# Queries.
+#----------------------------------------------------------------------------#
+
+
+def venue_directory():
+    # upcoming show counts are maintained on Venue, so no join is needed
+    return db.session.query(
+        Venue.city,
+        Venue.state,
+        Venue.id,
+        Venue.name,
+        Venue.upcoming_shows_count,
+        Venue.updated_at,
+    )
+
+
+def venue_shows(venue_id):
+    return db.session.query(
+        Artist.id, Artist.name, Artist.image_link, Show.start_time
+    ).join(Artist).filter(Show.venue_id == venue_id).order_by(Show.start_time)
+
+
+def artist_shows(artist_id):
+    return db.session.query(
+        Venue.id, Venue.name, Venue.image_link, Show.start_time
+    ).join(Venue).filter(Show.artist_id == artist_id).order_by(Show.start_time)
+
+
+def artist_venue_ids(artist_id):
+    # venues whose pages list a show by this artist
+    return [row[0] for row in db.session.query(
+        Show.venue_id).filter(Show.artist_id == artist_id).distinct()]
+
+
+def venue_artist_ids(venue_id):
+    # artists whose pages list a show at this venue
+    return [row[0] for row in db.session.query(
+        Show.artist_id).filter(Show.venue_id == venue_id).distinct()]
+
+
+def split_shows(rows, now, fields):
+    '''
+    Splits show rows into (past, upcoming) lists of dicts in one pass, using
+    `fields` as the dict keys for each row's columns. Both lists keep the
+    query's start_time order.
+    '''
+    past_shows = []
+    upcoming_shows = []
+    for row in rows:
+        start_time = row[-1]
+        if start_time is None:
+            continue
+        show = dict(zip(fields, row))
+        show['start_time'] = str(start_time)
+        if start_time < now:
+            past_shows.append(show)
+        else:
+            upcoming_shows.append(show)
+    return past_shows, upcoming_shows
+
+
+def show_window(query, start=None, end=None, venue_id=None, artist_id=None):
+    # shows starting in [start, end): a range scan on ix_show_start_time_id,
+    # or on the venue or artist index when one is given, so past shows are
+    # never read for an upcoming window
+    if start is not None:
+        query = query.filter(Show.start_time >= start)
+    if end is not None:
+        query = query.filter(Show.start_time < end)
+    if venue_id is not None:
+        query = query.filter(Show.venue_id == venue_id)
+    if artist_id is not None:
+        query = query.filter(Show.artist_id == artist_id)
+    return query
+
+
+def calendar_venues(start, end, artist_id=None):
+    # venues with a show in [start, end), one row each for paginating
+    shows = show_window(db.session.query(Show.id), start, end, artist_id=artist_id)
+    return db.session.query(Venue.id, Venue.name).filter(
+        shows.filter(Show.venue_id == Venue.id).exists())
+
+
+def calendar_counts(venue_ids, start, end, bucket, artist_id=None):
+    '''
+    Returns {(venue_id, bucket start): show count} for shows at `venue_ids`
+    starting in [start, end), bucketed by 'day' or 'week' (weeks start on
+    Monday).
+    '''
+    period = func.date_trunc(bucket, Show.start_time)
+    query = show_window(db.session.query(Show.venue_id, period, func.count(Show.id)),
+                        start, end, artist_id=artist_id)
+    query = query.filter(Show.venue_id.in_(venue_ids)).group_by(Show.venue_id, period)
+    return {(venue_id, period_start): count for venue_id, period_start, count in query}
+
+
+def refresh_show_counts(now, since=None):
+    '''
+    Recomputes the past/upcoming show counters of every artist and venue
+    with a show starting in [since, now), i.e. shows that have become past
+    since the last refresh. Without `since` every counter is recomputed.
+    Inserts and deletes are counted by a trigger on Show.
+    '''
+    for model, show_column in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+        upcoming = db.session.query(func.count(Show.id)).filter(
+            show_column == model.id, Show.start_time >= now).as_scalar()
+        past = db.session.query(func.count(Show.id)).filter(
+            show_column == model.id, Show.start_time < now).as_scalar()
+        query = model.query
+        if since is not None:
+            query = query.filter(model.id.in_(db.session.query(show_column).filter(
+                Show.start_time >= since, Show.start_time < now)))
+        query.update({
+            model.upcoming_shows_count: upcoming,
+            model.past_shows_count: past,
+        }, synchronize_session=False)
+
+
+def with_genre(query, model, genre):
+    # array containment (@>) is answered from the GIN index on genres
+    return query.filter(model.genres.contains([genre]))
+
+
+def genre_counts(kind, state=None):
+    '''
+    Returns [(genre, count)] of artists or venues (`kind`) listing each
+    genre, optionally within one state, most common first. The counts come
+    from GenreCount, so the Artist and Venue tables are not scanned.
+    '''
+    total = func.sum(GenreCount.count)
+    query = db.session.query(GenreCount.genre, total).filter(GenreCount.kind == kind)
+    if state:
+        query = query.filter(GenreCount.state == state)
+    return query.group_by(GenreCount.genre).having(total > 0).order_by(
+        total.desc(), GenreCount.genre).all()
+
+
+def venues_in_cells(cells):
+    # venues with upcoming shows in the given geohash cells; each cell is
+    # one range scan on ix_venue_geohash
+    return db.session.query(
+        Venue.id,
+        Venue.name,
+        Venue.city,
+        Venue.state,
+        Venue.image_link,
+        Venue.upcoming_shows_count,
+        Venue.latitude,
+        Venue.longitude,
+    ).filter(
+        or_(*[Venue.geohash.like(cell + '%') for cell in cells]),
+        Venue.upcoming_shows_count > 0)
+
+
+def venues_near(latitude, longitude, radius_km, limit):
+    '''
+    Returns up to `limit` (distance_km, row) pairs for venues with upcoming
+    shows within `radius_km` of a point, nearest first. Only the grid cells
+    covering the radius are read, so the cost follows the number of venues
+    nearby rather than the size of the table.
+    '''
+    nearby = []
+    for row in venues_in_cells(geo.covering_cells(latitude, longitude, radius_km)):
+        distance = geo.distance_km(latitude, longitude, row.latitude, row.longitude)
+        if distance <= radius_km:
+            nearby.append((distance, row))
+    nearby.sort(key=lambda item: item[0])
+    return nearby[:limit]
+
+
+#----------------------------------------------------------------------------#
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+def seq_scans(query):
+    '''
+    Returns the tables `query` reads with a sequential scan on Postgres.
+    Sequential scans are disabled for the check so the planner reports one
+    only when no usable index exists, whatever the table sizes.
+    '''
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    connection = db.session.connection()
+    connection.execute('SET LOCAL enable_seqscan = off')
+    result = connection.execute(
+        'EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params).scalar()
+    plan = result[0]['Plan']
+    return [node.get('Relation Name') for node in _plan_nodes(plan)
+            if node['Node Type'] == 'Seq Scan']
+
+
+def hot_queries():
+    # the queries behind venues(), artists(), venues_nearby(), shows(),
+    # show_venue() and show_artist()
+    directory = venue_directory()
+    yield 'venues', directory.order_by(
+        Venue.state, Venue.city, Venue.id).limit(51)
+    yield 'venues (next page)', directory.filter(
+        after([Venue.state, Venue.city, Venue.id], ['NY', 'New York', 1])
+    ).order_by(Venue.state, Venue.city, Venue.id).limit(51)
+    yield 'venues (genre)', with_genre(directory, Venue, 'Jazz').filter(
+        Venue.state == 'NY').order_by(Venue.state, Venue.city, Venue.id).limit(51)
+    yield 'artists (genre)', with_genre(Artist.query, Artist, 'Jazz').order_by(
+        Artist.id).limit(51)
+    yield 'venues nearby', venues_in_cells(geo.covering_cells(40.7128, -74.006, 25))
+    yield 'shows (upcoming)', show_window(
+        db.session.query(Show.id, Show.start_time), start=datetime.now()
+    ).order_by(Show.start_time, Show.id).limit(51)
+    yield 'show_venue', venue_shows(1)
+    yield 'show_artist', artist_shows(1)
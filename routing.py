@@ -0,0 +1,108 @@
+import itertools
+import threading
+import time
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import create_engine, orm
+from sqlalchemy.exc import SQLAlchemyError
+from config import engine_options
+
+#----------------------------------------------------------------------------#
+# Read replica routing.
+#----------------------------------------------------------------------------#
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+class Replica(object):
+
+    def __init__(self, engine, check_interval):
+        self.engine = engine
+        self.check_interval = check_interval
+        self.checked_at = 0
+        self.healthy = True
+
+    def is_healthy(self):
+        # re-checked with SELECT 1 at most once per check_interval
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return self.healthy
+        self.checked_at = now
+        try:
+            with self.engine.connect() as connection:
+                connection.execute('SELECT 1')
+            self.healthy = True
+        except SQLAlchemyError:
+            self.healthy = False
+            current_app.logger.warning('Replica %s failed its health check',
+                                       self.engine.url.host)
+        return self.healthy
+
+
+class ReplicaRouter(object):
+    '''
+    Engines for SQLALCHEMY_REPLICA_URLS, handed out round robin while they
+    pass their health check.
+    '''
+
+    def __init__(self, app=None):
+        self.replicas = []
+        self._cycle = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        interval = app.config.get('REPLICA_CHECK_INTERVAL', 10)
+        self.replicas = [Replica(create_engine(url, **self._options(app, url)), interval)
+                         for url in app.config.get('SQLALCHEMY_REPLICA_URLS', [])]
+        self._cycle = itertools.cycle(self.replicas)
+        app.extensions['replicas'] = self
+        app.before_request(self._route_request)
+        app.after_request(self._remember_write)
+
+    @staticmethod
+    def _options(app, url):
+        # built for each replica's own dialect, with the primary's pool sizes
+        config = app.config
+        return engine_options(url, config.get('DB_POOL_SIZE', 5), config.get('DB_MAX_OVERFLOW', 5),
+                              config.get('STATEMENT_TIMEOUT_MS', 5000), config.get('PGBOUNCER', False))
+
+    def pick(self):
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if replica.is_healthy():
+                return replica.engine
+        return None
+
+    def _route_request(self):
+        # reads go to a replica unless this client wrote recently, so it
+        # always sees its own writes
+        g.read_only = request.method in READ_METHODS and \
+            session.get('primary_until', 0) < time.time()
+
+    def _remember_write(self, response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            session['primary_until'] = time.time() + \
+                current_app.config.get('READ_YOUR_WRITES_SECONDS', 5)
+        return response
+
+
+class RoutingSession(SignallingSession):
+
+    def get_bind(self, mapper=None, clause=None):
+        if not self._flushing and has_request_context() and g.get('read_only'):
+            # one replica per request, so all its reads share a snapshot
+            if 'replica' not in g:
+                router = current_app.extensions.get('replicas')
+                g.replica = router.pick() if router else None
+            if g.replica is not None:
+                return g.replica
+        return SignallingSession.get_bind(self, mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
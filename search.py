@@ -0,0 +1,41 @@
+import re
+from sqlalchemy import func, or_
+
+#----------------------------------------------------------------------------#
+# Search.
+#----------------------------------------------------------------------------#
+
+SEARCH_LIMIT = 20
+
+
+def _prefix_tsquery(term):
+    # 'jazz caf' -> 'jazz:* & caf:*' so partially typed words still match
+    return ' & '.join(word + ':*' for word in re.findall(r'\w+', term))
+
+
+def _postgres_search(model, term, limit, filters):
+    # search_vector (name, city, state, genres) is kept current by a trigger
+    # and GIN indexed; the trigram index on name serves the ILIKE and
+    # similarity() for misspelt or mid-word matches
+    tsquery = func.to_tsquery('simple', _prefix_tsquery(term))
+    rank = func.greatest(
+        func.ts_rank(model.search_vector, tsquery),
+        func.similarity(model.name, term))
+    return model.query.filter(or_(
+        model.search_vector.op('@@')(tsquery),
+        model.name.ilike(f'%{term}%'),
+    ), *filters).order_by(rank.desc(), model.id).limit(limit).all()
+
+
+def search(model, term, limit=SEARCH_LIMIT, filters=()):
+    '''
+    Returns at most `limit` instances of `model` (Artist or Venue) matching
+    `term` on name, city, state or genres and every criterion in `filters`,
+    best match first.
+    '''
+    term = (term or '').strip()
+    if not re.search(r'\w', term):
+        # nothing to rank (e.g. a facet link with an empty search_term):
+        # the filtered rows in id order, without scoring the whole table
+        return model.query.filter(*filters).order_by(model.id).limit(limit).all()
+    return _postgres_search(model, term, limit, filters)
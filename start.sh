@@ -1,4 +1,9 @@
 source fyyur/bin/activate
-export FLASK_APP=myapp
-export FLASK_ENV=development 
-python3 app.py
\ No newline at end of file
+export FLASK_APP=app
+if [ "$FYYUR_ENV" = "production" ]; then
+    # SECRET_KEY signs session cookies and must be the same in every worker
+    : "${SECRET_KEY:?SECRET_KEY must be set in production}"
+    exec gunicorn -c gunicorn.conf.py wsgi:app
+fi
+export FLASK_ENV=development
+python3 app.py
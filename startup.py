@@ -0,0 +1,71 @@
+'''
+Worker boot budget: imports app.py and builds the app in a fresh
+interpreter under `python -X importtime`, then fails if that takes
+longer than the budget or pulls in a module that should load lazily.
+
+    python startup.py --budget-ms 1500
+'''
+import argparse
+import os
+import subprocess
+import sys
+
+BOOT = 'from app import create_app; create_app()'
+
+BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 1500))
+
+# only needed by the flask command or on first use, never at boot;
+# babel is not listed since flask_wtf imports it with the forms
+DEFERRED_MODULES = ('alembic', 'flask_migrate', 'dateutil')
+
+
+def import_times():
+    '''Returns [(module, cumulative_us, depth)] for one cold boot.'''
+    env = dict(os.environ, FYYUR_ENV=os.environ.get('FYYUR_ENV', 'testing'))
+    env.pop('FLASK_RUN_FROM_CLI', None)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', BOOT],
+                            env=env, capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        times.append((name.strip(), int(cumulative), depth))
+    return times
+
+
+def boot_ms(times):
+    # cumulative times already include children, so only top-level
+    # imports are added up
+    return sum(us for _, us, depth in times if depth == 0) / 1000
+
+
+def eager_modules(times):
+    loaded = {name.split('.')[0] for name, _, _ in times}
+    return sorted(loaded.intersection(DEFERRED_MODULES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    times = import_times()
+    top_level = [(name, us) for name, us, depth in times if depth == 0]
+    for name, us in sorted(top_level, key=lambda item: -item[1])[:args.top]:
+        print(f'{us / 1000:>9.1f} ms  {name}')
+    total_ms = boot_ms(times)
+    print(f'{total_ms:>9.1f} ms  total (budget {args.budget_ms:.0f} ms)')
+
+    eager = eager_modules(times)
+    if eager:
+        print('Imported at boot but should be deferred: ' + ', '.join(eager))
+    if eager or total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import random
+from datetime import datetime, timedelta
+from forms import VenueForm
+
+#----------------------------------------------------------------------------#
+# Synthetic catalogue.
+#----------------------------------------------------------------------------#
+
+GENRES = [value for value, _ in VenueForm.genres.kwargs['choices']]
+
+# weighted towards big markets, as real listings are
+CITIES = [
+    ('New York', 'NY', 12), ('Los Angeles', 'CA', 10), ('Chicago', 'IL', 7),
+    ('Nashville', 'TN', 6), ('Austin', 'TX', 6), ('San Francisco', 'CA', 5),
+    ('Seattle', 'WA', 4), ('New Orleans', 'LA', 4), ('Atlanta', 'GA', 4),
+    ('Boston', 'MA', 3), ('Denver', 'CO', 3), ('Philadelphia', 'PA', 3),
+    ('Portland', 'OR', 2), ('Detroit', 'MI', 2), ('Minneapolis', 'MN', 2),
+    ('Miami', 'FL', 2), ('Phoenix', 'AZ', 1), ('Kansas City', 'MO', 1),
+    ('Memphis', 'TN', 1), ('Salt Lake City', 'UT', 1),
+]
+
+NAME_WORDS = [
+    'Blue', 'Velvet', 'Electric', 'Midnight', 'Golden', 'Silver', 'Broken',
+    'Neon', 'Wild', 'Hollow', 'Crimson', 'Lucky', 'Echo', 'Northern', 'Royal',
+    'Paper', 'Iron', 'Honey', 'Static', 'Crystal', 'Rolling', 'Quiet',
+]
+ARTIST_SUFFIXES = ['Band', 'Collective', 'Trio', 'Quartet', 'Orchestra', 'Project', 'Kids']
+VENUE_SUFFIXES = ['Hall', 'Lounge', 'Club', 'Theatre', 'Room', 'Garden', 'Tavern']
+
+# start hours weighted towards the evening
+HOURS = [(18, 1), (19, 3), (20, 5), (21, 4), (22, 2), (23, 1), (14, 1)]
+
+
+def _weighted(rng, pairs):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights)[0]
+
+
+def _name(rng, suffixes):
+    return f'{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {rng.choice(suffixes)}'
+
+
+def _location(rng):
+    city, state, _ = rng.choices(CITIES, [weight for *_, weight in CITIES])[0]
+    return city, state
+
+
+def artists(rng, first_id, count):
+    for id in range(first_id, first_id + count):
+        city, state = _location(rng)
+        yield {
+            'id': id,
+            'name': _name(rng, ARTIST_SUFFIXES),
+            'city': city,
+            'state': state,
+            'phone': f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            'genres': rng.sample(GENRES, rng.choice((1, 1, 2, 3))),
+            'image_link': f'https://picsum.photos/seed/artist{id}/300',
+            'seeking_venue': rng.random() < 0.3,
+        }
+
+
+def venues(rng, first_id, count):
+    for id in range(first_id, first_id + count):
+        city, state = _location(rng)
+        yield {
+            'id': id,
+            'name': _name(rng, VENUE_SUFFIXES),
+            'city': city,
+            'state': state,
+            'address': f'{rng.randint(1, 9999)} {rng.choice(NAME_WORDS)} St',
+            'phone': f'{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            'genres': rng.sample(GENRES, rng.choice((1, 2, 3, 4))),
+            'image_link': f'https://picsum.photos/seed/venue{id}/300',
+            'seeking_talent': rng.random() < 0.4,
+        }
+
+
+def shows(rng, artist_ids, venue_ids, count, now=None):
+    '''
+    Shows spread over the last two years and the next one, busier on
+    Fridays and Saturdays, with popular artists and venues booked more
+    often (a skewed pick over the id ranges).
+    '''
+    now = now or datetime.now()
+    first_day = now - timedelta(days=730)
+    for _ in range(count):
+        day = first_day + timedelta(days=rng.randrange(1095))
+        if day.weekday() not in (4, 5) and rng.random() < 0.4:
+            day += timedelta(days=(4 - day.weekday()) % 7)
+        start_time = day.replace(hour=_weighted(rng, HOURS), minute=rng.choice((0, 30)),
+                                 second=0, microsecond=0)
+        yield {
+            'artist_id': artist_ids[int(len(artist_ids) * rng.random() ** 2)],
+            'venue_id': venue_ids[int(len(venue_ids) * rng.random() ** 2)],
+            'start_time': start_time,
+        }
+
+
+def generator(seed=None):
+    return random.Random(seed)
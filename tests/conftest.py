@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+
+@pytest.fixture
+def app():
+    # a fresh schema in the TEST_DATABASE_URL database for every test
+    from app import create_app
+    from models import db
+    app = create_app('testing')
+    with app.app_context():
+        try:
+            db.session.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            db.session.commit()
+        except OperationalError:
+            pytest.skip('test database is not reachable')
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements():
+    '''Records the statements sent to any engine while the test runs.'''
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(Engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.mark.parametrize('query', ['since=yesterday', 'since=2026-13-01', 'since_id=x1'])
+def test_malformed_export_delta_is_rejected(client, query):
+    assert client.get('/api/v1/artists/export?' + query).status_code == 400
+
+
+def test_export_delta_since_a_time(client):
+    response = client.get('/api/v1/artists/export?since=2026-05-01T20:00:00')
+    assert response.status_code == 200
@@ -0,0 +1,74 @@
+import threading
+import time
+from autocomplete import PrefixIndex, _keys
+
+
+def _aligned(index):
+    return all(key in _keys(index._names[id]) for key, id in zip(index._keys, index._ids))
+
+
+def test_lookup_matches_word_starts():
+    index = PrefixIndex()
+    index.load([(1, 'Blue Velvet Hall'), (2, 'Hall of Echoes'), (3, 'Neon Club')])
+    assert [id for _, id, _ in index.matches('hall', 10)] == [1, 2]
+    assert index.matches('velvet h', 10)[0][1:] == (1, 'Blue Velvet Hall')
+    assert index.matches('zzz', 10) == []
+
+
+def test_add_and_remove_keep_keys_and_ids_aligned():
+    index = PrefixIndex()
+    index.add(1, 'Blue Velvet Hall')
+    index.add(1, 'Red Room')
+    assert index.matches('blue', 10) == []
+    assert index.matches('room', 10) == [('room', 1, 'Red Room')]
+    index.remove(1)
+    assert len(index) == 0 and index._keys == [] and len(index._ids) == 0
+
+
+def test_concurrent_writers_and_reader():
+    index = PrefixIndex()
+    mismatched = []
+    done = threading.Event()
+
+    def write(first):
+        for id in range(first, first + 6000, 3):
+            index.add(id, f'name{id} x{id % 7}')
+
+    def read():
+        while not done.is_set():
+            mismatched.extend(key for key, id, name in index.matches('name', 20)
+                              if key not in _keys(name))
+
+    reader = threading.Thread(target=read)
+    writers = [threading.Thread(target=write, args=(first,)) for first in range(3)]
+    reader.start()
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    reader.join()
+
+    assert mismatched == []
+    assert len(index) == 6000
+    assert _aligned(index)
+
+
+def test_lookups_only_read_the_index(app, statements):
+    from autocomplete import NameIndex
+    from models import db, Venue
+    db.session.add(Venue(name='Blue Velvet Hall', city='City', state='CA', genres=['Jazz']))
+    db.session.commit()
+    index = NameIndex(app)
+    index.refresh_seconds = 3600
+    index.start(app)
+    try:
+        for _ in range(100):
+            if index._refreshed is not None:
+                break
+            time.sleep(0.05)
+        del statements[:]
+        assert [match['name'] for match in index.lookup('hall')] == ['Blue Velvet Hall']
+        assert statements == []
+    finally:
+        index.stop()
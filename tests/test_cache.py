@@ -0,0 +1,91 @@
+import threading
+import pytest
+import cache as cache_module
+from cache import LRUCache, LocalClient, SharedCache, ViewCache
+from models import db
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_lru_entries_expire_after_ttl(clock):
+    lru = LRUCache(ttl=10)
+    lru.set('a', 1)
+    clock[0] += 9
+    assert lru.get('a') == 1
+    clock[0] += 2
+    assert lru.get('a') is None
+    assert (lru.hits, lru.misses) == (1, 1)
+
+
+def test_lru_evicts_the_least_recently_used(clock):
+    lru = LRUCache(max_entries=2)
+    lru.set('a', 1)
+    lru.set('b', 2)
+    lru.get('a')
+    lru.set('c', 3)
+    assert lru.get('b') is None
+    assert (lru.get('a'), lru.get('c')) == (1, 3)
+    assert lru.evictions == 1
+
+
+def test_shared_cache_round_trips_json(clock):
+    shared = SharedCache(LocalClient(), ttl=10)
+    shared.set('venue:1', {'name': 'Blue Note', 'genres': ['Jazz']})
+    assert shared.get('venue:1') == {'name': 'Blue Note', 'genres': ['Jazz']}
+    shared.delete('venue:1')
+    assert shared.get('venue:1') is None
+    shared.set('venue:1', [1])
+    clock[0] += 11
+    assert shared.get('venue:1') is None
+
+
+def _request(app):
+    # a fresh app context, so versions are read again as in a new request
+    return app.app_context()
+
+
+def _other_worker(app, work):
+    # runs `work` on its own thread, so with its own session and connection
+    def run():
+        with app.app_context():
+            work()
+            db.session.remove()
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+
+def test_invalidation_reaches_every_worker(app):
+    writer, reader = ViewCache(LRUCache()), ViewCache(LRUCache())
+    with _request(app):
+        writer.set('venue:1', 'old')
+        reader.set('venue:1', 'old')
+    with _request(app):
+        assert reader.get('venue:1') == 'old'
+    with _request(app):
+        writer.invalidate('venue:1')
+        db.session.commit()
+    with _request(app):
+        assert reader.get('venue:1') is None
+        assert writer.get('venue:1') is None
+    assert reader.stale == 1
+
+
+def test_shared_entry_rebuilt_before_the_commit_is_dropped(app):
+    backend = SharedCache(LocalClient())
+    writer, reader = ViewCache(backend), ViewCache(backend)
+    with _request(app):
+        writer.invalidate('venue:1')
+        # another worker rebuilds from the data the write has not committed
+        _other_worker(app, lambda: reader.set('venue:1', 'old'))
+        db.session.commit()
+    with _request(app):
+        assert reader.get('venue:1') is None
+        reader.set('venue:1', 'new')
+    with _request(app):
+        assert writer.get('venue:1') == 'new'
@@ -0,0 +1,68 @@
+import csv
+from datetime import datetime
+import pytest
+from flask import Flask
+from catalog import csv_row, read_rows, validate_row
+from forms import ArtistForm, ShowForm
+
+
+@pytest.fixture(autouse=True)
+def app_context():
+    # the forms read their settings from the current app
+    app = Flask(__name__)
+    app.config.update(SECRET_KEY='test', WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        yield
+
+
+def _round_trip(tmp_path, columns, row):
+    # writes one row the way the CSV export does and reads it back
+    path = tmp_path / 'export.csv'
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        writer.writerow(csv_row(row))
+    return next(read_rows(str(path)))
+
+
+def test_exported_artist_imports_with_the_same_flags(tmp_path):
+    columns = ['id', 'name', 'city', 'state', 'genres', 'seeking_venue', 'updated_at']
+    for seeking in (True, False):
+        row = _round_trip(tmp_path, columns, [
+            7, 'The Wild Sax Band', 'San Francisco', 'CA', ['Jazz', 'Funk'],
+            seeking, datetime(2026, 5, 1, 20, 0, 0, 12345)])
+        values, errors = validate_row(ArtistForm, row)
+        assert errors is None
+        assert values['seeking_venue'] is seeking
+        assert values['genres'] == ['Jazz', 'Funk']
+
+
+def test_exported_show_imports_with_the_same_start_time(tmp_path):
+    start_time = datetime(2026, 5, 1, 20, 0)
+    row = _round_trip(tmp_path, ['id', 'artist_id', 'venue_id', 'start_time'],
+                      [3, 4, 1, start_time])
+    values, errors = validate_row(ShowForm, row)
+    assert errors is None
+    assert values['start_time'] == start_time
+
+
+def test_ndjson_show_time_is_accepted_as_iso():
+    values, errors = validate_row(ShowForm, {
+        'artist_id': 4, 'venue_id': 1, 'start_time': '2026-05-01T20:00:00'})
+    assert errors is None
+    assert values['start_time'] == datetime(2026, 5, 1, 20, 0)
+
+
+@pytest.mark.parametrize('id', ['x1', '1.5', '-3', True])
+def test_bad_id_rejects_the_row(id):
+    values, errors = validate_row(ShowForm, {
+        'id': id, 'artist_id': 4, 'venue_id': 1, 'start_time': '2026-05-01 20:00:00'})
+    assert values is None
+    assert 'id' in errors
+
+
+def test_numeric_id_is_kept():
+    values, errors = validate_row(ShowForm, {
+        'id': '12', 'artist_id': 4, 'venue_id': 1, 'start_time': '2026-05-01 20:00:00'})
+    assert errors is None
+    assert values['id'] == 12
@@ -0,0 +1,34 @@
+import pytest
+import config
+from config import engine_options
+
+
+def test_postgres_gets_pool_and_statement_timeout():
+    options = engine_options('postgresql://localhost/fyyur', 5, 5, 2000, False)
+    assert options['pool_size'] == 5
+    assert options['max_overflow'] == 5
+    assert options['connect_args'] == {'options': '-c statement_timeout=2000'}
+
+
+def test_pgbouncer_uses_no_pool():
+    options = engine_options('postgresql://localhost/fyyur', 5, 5, 2000, True)
+    assert list(options) == ['poolclass']
+
+
+def test_sqlite_gets_no_pool_options():
+    assert engine_options('sqlite://', 5, 5, 2000, False) == {}
+    assert engine_options('sqlite:////tmp/fyyur.db', 5, 5, 2000, True) == {}
+
+
+def test_other_servers_get_no_postgres_options():
+    options = engine_options('mysql://localhost/fyyur', 5, 5, 2000, False)
+    assert 'connect_args' not in options
+    assert options['pool_size'] == 5
+
+
+def test_production_refuses_to_start_without_a_secret_key(monkeypatch):
+    monkeypatch.setattr(config.ProductionConfig, 'SECRET_KEY', None)
+    with pytest.raises(RuntimeError):
+        config.profile('production')
+    monkeypatch.setattr(config.ProductionConfig, 'SECRET_KEY', 'shared')
+    assert config.profile('production') is config.ProductionConfig
@@ -0,0 +1,30 @@
+import pytest
+import geo
+
+NEW_YORK = (40.7128, -74.006)
+TIMES_SQUARE = (40.7580, -73.9855)
+LOS_ANGELES = (34.0522, -118.2437)
+
+
+def test_encode_known_points():
+    assert geo.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert geo.encode(*NEW_YORK) == 'dr5regw3p'
+    assert geo.encode(*NEW_YORK, precision=5) == 'dr5re'
+
+
+def test_distance_km():
+    assert geo.distance_km(*NEW_YORK, *NEW_YORK) == 0
+    assert geo.distance_km(*NEW_YORK, *TIMES_SQUARE) == pytest.approx(5.3, abs=0.1)
+    assert geo.distance_km(*NEW_YORK, *LOS_ANGELES) == pytest.approx(3936, abs=5)
+
+
+def test_covering_cells_contain_every_point_in_the_radius():
+    cells = geo.covering_cells(*NEW_YORK, 25)
+    assert len(cells) == 9 and all(len(cell) == 3 for cell in cells)
+    assert any(geo.encode(*TIMES_SQUARE).startswith(cell) for cell in cells)
+    assert not any(geo.encode(*LOS_ANGELES).startswith(cell) for cell in cells)
+
+
+def test_covering_cells_wrap_at_the_antimeridian():
+    cells = geo.covering_cells(0.0, 179.99, 25)
+    assert any(geo.encode(0.0, -179.99).startswith(cell) for cell in cells)
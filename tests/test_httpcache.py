@@ -0,0 +1,59 @@
+def test_pages_revalidate_in_browsers_and_are_reused_by_shared_caches(client):
+    response = client.get('/')
+    assert response.status_code == 200
+    assert response.cache_control.public
+    assert response.cache_control.max_age == 0
+    assert response.cache_control.s_maxage == client.application.config['CACHE_CONTROL_MAX_AGE']
+    assert not response.cache_control.no_cache
+
+
+def test_matching_etag_gets_304_without_a_body(client):
+    etag = client.get('/').headers['ETag']
+    response = client.get('/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_changed_etag_gets_the_page(client):
+    response = client.get('/', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.data
+
+
+def test_validators_move_with_the_clock_window(client, monkeypatch):
+    import httpcache
+    from datetime import datetime, timedelta
+
+    now = [datetime(2026, 5, 1, 20, 1)]
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now[0]
+
+    monkeypatch.setattr(httpcache, 'datetime', Clock)
+    first = client.get('/shows')
+    assert client.get('/shows', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    # the upcoming window moves on without any write
+    now[0] += timedelta(minutes=5)
+    for headers in ({'If-None-Match': first.headers['ETag']},
+                    {'If-Modified-Since': first.headers['Last-Modified']}):
+        response = client.get('/shows', headers=headers)
+        assert response.status_code == 200
+        assert response.headers['ETag'] != first.headers['ETag']
+
+
+def test_current_window_rounds_down_to_the_step(monkeypatch):
+    import httpcache
+    from datetime import datetime, timedelta
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 5, 1, 20, 7, 31, 500)
+
+    monkeypatch.setattr(httpcache, 'datetime', Clock)
+    assert httpcache.current_window(timedelta(minutes=5)) == datetime(2026, 5, 1, 20, 5)
+    assert httpcache.current_window(timedelta(days=1)) == datetime(2026, 5, 1)
@@ -0,0 +1,9 @@
+from models import db
+from queries import hot_queries, seq_scans
+
+
+def test_hot_queries_use_indexes(app):
+    # same check as `flask catalog check-indexes`, on the schema the models declare
+    scans = {name: seq_scans(query) for name, query in hot_queries()}
+    db.session.rollback()
+    assert {name: tables for name, tables in scans.items() if tables} == {}
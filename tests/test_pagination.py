@@ -0,0 +1,49 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+from pagination import after, decode_cursor, encode_cursor, _coerce
+
+shows = Table('show', MetaData(),
+              Column('id', Integer, primary_key=True),
+              Column('name', String),
+              Column('start_time', DateTime))
+
+
+def test_cursor_round_trip():
+    values = ['2026-05-01T20:00:00', 7]
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+@pytest.mark.parametrize('token', ['', 'not base64!', encode_cursor({'id': 1})])
+def test_malformed_cursor_decodes_to_none(token):
+    assert decode_cursor(token) is None
+
+
+def test_values_are_coerced_by_column_type():
+    assert _coerce(shows.c.start_time, '2026-05-01T20:00:00') == datetime(2026, 5, 1, 20)
+    assert _coerce(shows.c.id, 7) == 7
+    assert _coerce(shows.c.name, 'x') == 'x'
+    assert _coerce(shows.c.name, None) is None
+
+
+@pytest.mark.parametrize('column, value', [
+    (shows.c.id, 'x'),
+    (shows.c.id, True),
+    (shows.c.id, 1.5),
+    (shows.c.id, 2 ** 40),
+    (shows.c.name, 1),
+    (shows.c.name, 'a\x00b'),
+    (shows.c.start_time, 1),
+    (shows.c.start_time, ['2026-05-01']),
+    (shows.c.start_time, 'yesterday'),
+])
+def test_mismatched_values_are_rejected(column, value):
+    with pytest.raises((ValueError, TypeError)):
+        after([column], [value])
+
+
+def test_descending_pages_compare_backwards():
+    clause = after([shows.c.start_time, shows.c.id], ['2026-05-01T20:00:00', 7], descending=True)
+    assert clause.operator.__name__ == 'lt'
+    clause = after([shows.c.start_time, shows.c.id], ['2026-05-01T20:00:00', 7])
+    assert clause.operator.__name__ == 'gt'
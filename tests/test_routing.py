@@ -0,0 +1,70 @@
+import os
+import pytest
+from flask import Flask
+from routing import ReplicaRouter, RoutingSQLAlchemy
+
+
+def _database(path, name):
+    import sqlite3
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE marker (name TEXT)')
+    connection.execute('INSERT INTO marker VALUES (?)', (name,))
+    connection.commit()
+    connection.close()
+    return 'sqlite:///' + path
+
+
+def _app(primary_url, replica_urls):
+    app = Flask(__name__)
+    app.config.update(
+        SECRET_KEY='test',
+        SQLALCHEMY_DATABASE_URI=primary_url,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_REPLICA_URLS=replica_urls,
+        REPLICA_CHECK_INTERVAL=0,
+        READ_YOUR_WRITES_SECONDS=60,
+    )
+    db = RoutingSQLAlchemy()
+    db.init_app(app)
+    ReplicaRouter(app)
+
+    @app.route('/', methods=['GET', 'POST'])
+    def which():
+        return db.session.execute('SELECT name FROM marker').scalar()
+
+    return app
+
+
+@pytest.fixture
+def databases(tmp_path):
+    return (_database(str(tmp_path / 'primary.db'), 'primary'),
+            _database(str(tmp_path / 'replica.db'), 'replica'))
+
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(databases):
+    primary, replica = databases
+    client = _app(primary, [replica]).test_client()
+    assert client.get('/').data == b'replica'
+    assert client.post('/').data == b'primary'
+
+
+def test_reads_follow_a_write_to_the_primary(databases):
+    primary, replica = databases
+    app = _app(primary, [replica])
+    writer = app.test_client()
+    writer.post('/')
+    assert writer.get('/').data == b'primary'
+    # other clients keep reading from the replica
+    assert app.test_client().get('/').data == b'replica'
+
+
+def test_unhealthy_replica_falls_back_to_the_primary(databases, tmp_path):
+    primary, _ = databases
+    missing = 'sqlite:///' + os.path.join(str(tmp_path), 'missing', 'replica.db')
+    client = _app(primary, [missing]).test_client()
+    assert client.get('/').data == b'primary'
+
+
+def test_no_replicas_reads_from_the_primary(databases):
+    primary, _ = databases
+    assert _app(primary, []).test_client().get('/').data == b'primary'
@@ -0,0 +1,25 @@
+import pytest
+from models import db, Venue
+from search import search
+
+
+@pytest.fixture
+def venues(app):
+    for name, state in [('Blue Note', 'NY'), ('The Dueling Pianos Bar', 'NY'),
+                        ('Park Square Live', 'CA'), ('Blue Velvet Hall', 'CA')]:
+        db.session.add(Venue(name=name, city='City', state=state, genres=['Jazz']))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('term', ['', '   ', '%'])
+def test_empty_term_lists_filtered_rows_without_ranking(venues, statements, term):
+    del statements[:]
+    found = search(Venue, term, limit=3, filters=[Venue.state == 'NY'])
+    assert [venue.name for venue in found] == ['Blue Note', 'The Dueling Pianos Bar']
+    assert not any('similarity' in statement or 'ts_rank' in statement
+                   for statement in statements)
+
+
+def test_term_matches_partial_names(venues):
+    found = search(Venue, 'blue')
+    assert sorted(venue.name for venue in found) == ['Blue Note', 'Blue Velvet Hall']
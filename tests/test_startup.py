@@ -0,0 +1,13 @@
+from startup import boot_ms, eager_modules
+
+# the wall-clock budget itself is checked by `python startup.py` (a CI step)
+
+
+def test_boot_ms_counts_only_top_level_imports():
+    times = [('app', 500, 0), ('views', 300, 1), ('forms', 200, 2), ('json', 40, 0)]
+    assert boot_ms(times) == 0.54
+
+
+def test_eager_modules_reports_deferred_packages():
+    times = [('app', 500, 0), ('alembic.config', 80, 1), ('babel', 30, 2), ('dateutil', 20, 1)]
+    assert eager_modules(times) == ['alembic', 'dateutil']
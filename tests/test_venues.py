@@ -0,0 +1,48 @@
+import pytest
+from models import db, Venue
+
+
+def _add_venues(count, start=0):
+    for i in range(start, start + count):
+        db.session.add(Venue(name=f'Venue {i}', city=f'City {i % 3}', state='CA', genres=['Jazz']))
+    db.session.commit()
+
+
+def _venues_queries(client, statements):
+    # statements sent while serving one GET /venues
+    del statements[:]
+    response = client.get('/venues')
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_venues_query_count_does_not_grow_with_venues(app, statements):
+    _add_venues(1)
+    one = _venues_queries(app.test_client(), statements)
+    _add_venues(24, start=1)
+    many = _venues_queries(app.test_client(), statements)
+    assert one == many
+
+
+def _add_placed_venue(name, latitude, longitude):
+    import geo
+    db.session.add(Venue(name=name, city='City', state='NY', genres=['Jazz'],
+                         latitude=latitude, longitude=longitude,
+                         geohash=geo.encode(latitude, longitude), upcoming_shows_count=1))
+    db.session.commit()
+
+
+def test_venues_near_lists_only_venues_in_the_radius_nearest_first(app):
+    from queries import venues_near
+    _add_placed_venue('Times Square Hall', 40.7580, -73.9855)
+    _add_placed_venue('Brooklyn Bowl', 40.7219, -73.9575)
+    _add_placed_venue('Hollywood Bowl', 34.1122, -118.3391)
+    nearby = venues_near(40.7128, -74.006, 25, 10)
+    assert [row.name for _, row in nearby] == ['Brooklyn Bowl', 'Times Square Hall']
+    assert nearby[0][0] < nearby[1][0] < 25
+
+
+@pytest.mark.parametrize('radius', ['nan', 'inf', '-inf'])
+def test_nearby_rejects_a_radius_that_is_not_finite(client, radius):
+    response = client.get(f'/venues/nearby?lat=40.7128&lng=-74.006&radius={radius}')
+    assert response.status_code == 400
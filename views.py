@@ -0,0 +1,715 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import math
+from datetime import datetime, timedelta
+from itertools import groupby
+from flask import Blueprint, abort, current_app, render_template, request, flash, redirect, url_for, jsonify
+from forms import ArtistForm, VenueForm, ShowForm
+from models import db, Artist, Venue, Show, Watermark
+from httpcache import conditional, current_window
+from metrics import failed_commit
+from cache import cache, artist_key, venue_key
+from pagination import paginate
+from search import search
+from autocomplete import name_index
+from facets import selected_facets, facet_filters, facet_counts, facet_groups
+from queries import venue_directory, venue_shows, artist_shows, artist_venue_ids, venue_artist_ids, split_shows, with_genre, genre_counts, venues_near, show_window, calendar_venues, calendar_counts
+
+bp = Blueprint('main', __name__)
+
+# "now" for pages that split shows into past and upcoming moves in these
+# steps, so their ETags (see httpcache.conditional) move with it
+CLOCK_STEP = timedelta(minutes=5)
+
+NEARBY_RADIUS_KM = 25
+NEARBY_MAX_RADIUS_KM = 500
+NEARBY_LIMIT = 100
+
+# bucket: (length, default buckets shown, most buckets shown)
+CALENDAR_BUCKETS = {
+    'day': (timedelta(days=1), 14, 62),
+    'week': (timedelta(weeks=1), 8, 53),
+}
+
+
+def _window_arg(name):
+    # ?from= / ?to= as ISO dates or datetimes; a bare date for `to`
+    # includes that whole day
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        abort(400)
+    if name == 'to' and len(value) == 10:
+        moment += timedelta(days=1)
+    return moment
+
+#----------------------------------------------------------------------------#
+# Controllers.
+#----------------------------------------------------------------------------#
+
+
+@bp.route('/')
+@conditional()
+def index():
+    return render_template('pages/home.html')
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@bp.route('/venues')
+@conditional(Venue)
+def venues():
+    # ?genre= and ?state= narrow the directory; facet counts are precomputed
+    genre = request.args.get('genre')
+    state = request.args.get('state')
+    venues = venue_directory()
+    if genre:
+        venues = with_genre(venues, Venue, genre)
+    if state:
+        venues = venues.filter(Venue.state == state)
+    venues, next_cursor = paginate(
+        venues, [Venue.state, Venue.city, Venue.id],
+        key=lambda venue: [venue[1], venue[0], venue[2]])
+
+    data = []
+    for (city, state), area_venues in groupby(venues, key=lambda venue: venue[:2]):
+        data.append({
+            "city": city,
+            "state": state,
+            "venues": [{
+                "id": venue[2],
+                "name": venue[3],
+                "num_upcoming_shows": venue[4],
+                "item_key": 'venue-item:%s:%s' % (venue[2], venue[5]),
+            } for venue in area_venues]
+        })
+
+    return render_template('pages/venues.html', areas=data, next_cursor=next_cursor,
+                           genres=genre_counts('venue', state), genre=genre, state=state)
+
+
+@bp.route('/venues/nearby')
+@conditional(Venue)
+def venues_nearby():
+    # ?lat=&lng=[&radius=<km>]: venues with upcoming shows, nearest first
+    latitude = request.args.get('lat', type=float)
+    longitude = request.args.get('lng', type=float)
+    if latitude is None or longitude is None or \
+            not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        abort(400)
+    radius = request.args.get('radius', NEARBY_RADIUS_KM, type=float)
+    if not math.isfinite(radius):
+        # nan passes min() and max() and would widen the cells to the world
+        abort(400)
+    radius = min(max(radius, 0.1), NEARBY_MAX_RADIUS_KM)
+
+    data = [{
+        "id": venue.id,
+        "name": venue.name,
+        "city": venue.city,
+        "state": venue.state,
+        "image_link": venue.image_link,
+        "num_upcoming_shows": venue.upcoming_shows_count,
+        "distance_km": round(distance, 1),
+    } for distance, venue in venues_near(latitude, longitude, radius, NEARBY_LIMIT)]
+    return render_template('pages/venues_nearby.html', venues=data, radius=radius)
+
+
+@bp.route('/venues/search', methods=['GET', 'POST'])
+def search_venues():
+    # the header form POSTs the term; facet links GET it back with ?state= etc.
+    search_term = request.values.get('search_term', '')
+    selected = selected_facets(request.values)
+    venues = search(Venue, search_term, filters=facet_filters(Venue, selected))
+    response = {
+        "count": len(venues),
+        "data": venues,
+    }
+    facets = facet_groups(Venue, facet_counts(Venue, selected.get('state')), selected)
+    return render_template('pages/search_venues.html', results=response, search_term=search_term,
+                           facets=facets)
+
+
+@bp.route('/venues/<int:venue_id>')
+@conditional(Venue, Artist, Show, step=CLOCK_STEP)
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    now = current_window(CLOCK_STEP)
+    data = cache.get(venue_key(venue_id))
+    # a view model from an earlier window has shows on the wrong side of now
+    if data is not None and data.get('as_of') == now.isoformat():
+        return render_template('pages/show_venue.html', venue=data)
+
+    venue = Venue.query.get(venue_id)
+    if bool(venue) != True:
+        flash('Venue ' + venue_id + ' does not exist')
+        return render_template('pages/show_venue.html', venue=[])
+
+    past_shows, upcoming_shows = split_shows(
+        venue_shows(venue_id),
+        now,
+        ('artist_id', 'artist_name', 'artist_image_link', 'start_time'))
+
+    past_shows_count = len(past_shows)
+    upcoming_shows_count = len(upcoming_shows)
+
+    data = {
+        "id": venue.id,
+        "name": venue.name,
+        "genres": venue.genres,
+        "address": venue.address,
+        "city": venue.city,
+        "state": venue.state,
+        "phone": venue.phone,
+        "website": venue.website_link,
+        "facebook_link": venue.facebook_link,
+        "seeking_talent": venue.seeking_talent,
+        "seeking_description": venue.seeking_description,
+        "image_link": venue.image_link,
+        "past_shows": past_shows,
+        "upcoming_shows": upcoming_shows,
+        "past_shows_count": past_shows_count,
+        "upcoming_shows_count": upcoming_shows_count,
+        "as_of": now.isoformat(),
+    }
+    cache.set(venue_key(venue_id), data)
+
+    return render_template('pages/show_venue.html', venue=data)
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+    form = VenueForm()
+    return render_template('forms/new_venue.html', form=form)
+
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    form = VenueForm()
+    name = form.name.data
+    city = form.city.data
+    state = form.state.data
+    address = form.address.data
+    phone = form.phone.data
+    image_link = form.image_link.data
+    genres = form.genres.data
+    facebook_link = form.facebook_link.data
+    website_link = form.website_link.data
+    seeking_talent = form.seeking_talent.data
+    seeking_description = form.seeking_description.data
+
+    form_valid = form.validate_on_submit()
+    if form_valid:
+        error = False
+        try:
+            newVenue = Venue(
+                name=name,
+                city=city,
+                state=state,
+                address=address,
+                phone=phone,
+                image_link=image_link,
+                genres=genres,
+                facebook_link=facebook_link,
+                website_link=website_link,
+                seeking_talent=seeking_talent,
+                seeking_description=seeking_description
+            )
+            db.session.add(newVenue)
+            db.session.commit()
+            venue_id = newVenue.id
+        except:
+            error = True
+            db.session.rollback()
+            failed_commit()
+        finally:
+            db.session.close()
+
+        if error:
+            flash('An error occurred. Venue ' + name + ' could not be listed.')
+        else:
+            name_index.add('venue', venue_id, name)
+            flash('Venue ' + name + ' was successfully listed!')
+    else:
+        for field, message in form.errors.items():
+            flash(field + ' - ' + str(message))
+    return render_template('pages/home.html')
+
+
+@bp.route('/venues/<venue_id>', methods=['DELETE'])
+def delete_venue(venue_id):
+    error = False
+    try:
+        venue = Venue.query.get(venue_id)
+        stale_keys = [venue_key(venue_id)] + [
+            artist_key(id) for id in venue_artist_ids(venue_id)]
+        db.session.delete(venue)
+        # deletes leave no updated_at behind for page validators to see
+        db.session.merge(Watermark(name='venue_deleted', value=datetime.utcnow()))
+        cache.invalidate(*stale_keys)
+        db.session.commit()
+    except:
+        error = True
+        db.session.rollback()
+        failed_commit()
+    finally:
+        db.session.close()
+
+    if(error):
+        flash('Error, Venue belongs to a show or venue does not exist')
+    else:
+        name_index.remove('venue', int(venue_id))
+        flash('Venue with id ' + venue_id + ' successfully deleted')
+
+    return redirect(url_for('.index'))
+
+#  Artists
+#  ----------------------------------------------------------------
+
+
+@bp.route('/artists')
+@conditional(Artist)
+def artists():
+    genre = request.args.get('genre')
+    artists = Artist.query
+    if genre:
+        artists = with_genre(artists, Artist, genre)
+    artists, next_cursor = paginate(
+        artists, [Artist.id], key=lambda artist: [artist.id])
+    return render_template('pages/artists.html', artists=artists, next_cursor=next_cursor,
+                           genres=genre_counts('artist'), genre=genre)
+
+
+@bp.route('/artists/search', methods=['GET', 'POST'])
+def search_artists():
+    # the header form POSTs the term; facet links GET it back with ?state= etc.
+    search_term = request.values.get('search_term', '')
+    selected = selected_facets(request.values)
+    artist = search(Artist, search_term, filters=facet_filters(Artist, selected))
+    response = {
+        "count": len(artist),
+        "data": artist,
+    }
+    facets = facet_groups(Artist, facet_counts(Artist, selected.get('state')), selected)
+    return render_template('pages/search_artists.html', results=response, search_term=search_term,
+                           facets=facets)
+
+
+@bp.route('/artists/<int:artist_id>')
+@conditional(Artist, Venue, Show, step=CLOCK_STEP)
+def show_artist(artist_id):
+    # shows the artist page with the given artist_id
+    now = current_window(CLOCK_STEP)
+    data = cache.get(artist_key(artist_id))
+    if data is not None and data.get('as_of') == now.isoformat():
+        return render_template('pages/show_artist.html', artist=data)
+
+    artist = Artist.query.get(artist_id)
+    if bool(artist) != True:
+        flash('Artist ' + artist_id + ' does not exist')
+        return render_template('pages/show_artist.html', artist=[])
+
+    past_shows, upcoming_shows = split_shows(
+        artist_shows(artist_id),
+        now,
+        ('venue_id', 'venue_name', 'venue_image_link', 'start_time'))
+
+    past_shows_count = len(past_shows)
+    upcoming_shows_count = len(upcoming_shows)
+    data = {
+        "id": artist.id,
+        "name": artist.name,
+        "genres": artist.genres,
+        "city": artist.city,
+        "state": artist.state,
+        "phone": artist.phone,
+        "website": artist.website_link,
+        "facebook_link": artist.facebook_link,
+        "seeking_venue": artist.seeking_venue,
+        "seeking_description": artist.seeking_description,
+        "image_link": artist.image_link,
+        "past_shows": past_shows,
+        "upcoming_shows": upcoming_shows,
+        "past_shows_count": past_shows_count,
+        "upcoming_shows_count": upcoming_shows_count,
+        "as_of": now.isoformat(),
+    }
+    cache.set(artist_key(artist_id), data)
+
+    return render_template('pages/show_artist.html', artist=data)
+
+#  Update
+#  ----------------------------------------------------------------
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+    artist = Artist.query.get(artist_id)
+    defaultVal = {
+        'name': artist.name,
+        'city': artist.city,
+        'state': artist.state,
+        'phone': artist.phone,
+        'image_link': artist.image_link,
+        'genres': artist.genres,
+        'facebook_link': artist.facebook_link,
+        'website_link': artist.website_link,
+        'seeeking_venue': artist.seeking_venue,
+        'seeking_description': artist.seeking_description
+    }
+    form = ArtistForm(data=defaultVal)
+    return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    form = ArtistForm()
+    error = False
+
+    try:
+        artist = Artist.query.get(artist_id)
+        artist.name = form.name.data
+        artist.city = form.city.data
+        artist.state = form.state.data
+        artist.phone = form.phone.data
+        artist.image_link = form.image_link.data
+        artist.genres = form.genres.data
+        artist.facebook_link = form.facebook_link.data
+        artist.website_link = form.website_link.data
+        artist.seeking_venue = form.seeking_venue.data
+        artist.seeking_description = form.seeking_description.data
+        cache.invalidate(artist_key(artist_id), *[
+            venue_key(id) for id in artist_venue_ids(artist_id)])
+        db.session.commit()
+    except:
+        error = True
+        db.session.rollback()
+        failed_commit()
+    finally:
+        db.session.close()
+
+    if error:
+        flash('Error Updating artist ' + artist_id)
+    else:
+        name_index.add('artist', artist_id, form.name.data)
+        flash('Artist was successfully Updated')
+    return redirect(url_for('.show_artist', artist_id=artist_id))
+
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    venue = Venue.query.get(venue_id)
+    defaultVal = {
+        'name': venue.name,
+        'city': venue.city,
+        'state': venue.state,
+        'address': venue.address,
+        'phone': venue.phone,
+        'image_link': venue.image_link,
+        'genres': venue.genres,
+        'facebook_link': venue.facebook_link,
+        'website_link': venue.website_link,
+        'seeking_talent': venue.seeking_talent,
+        'seeking_description': venue.seeking_description
+    }
+    form = VenueForm(data=defaultVal)
+
+    return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    form = VenueForm()
+    error = False
+
+    try:
+        venue = Venue.query.get(venue_id)
+        if (venue.city, venue.state) != (form.city.data, form.state.data):
+            # moved: left for the next `flask catalog geocode` run
+            venue.latitude = venue.longitude = venue.geohash = None
+        venue.name = form.name.data
+        venue.city = form.city.data
+        venue.state = form.state.data
+        venue.address = form.address.data
+        venue.phone = form.phone.data
+        venue.image_link = form.image_link.data
+        venue.genres = form.genres.data
+        venue.facebook_link = form.facebook_link.data
+        venue.website_link = form.website_link.data
+        venue.seeking_talent = form.seeking_talent.data
+        venue.seeking_description = form.seeking_description.data
+        cache.invalidate(venue_key(venue_id), *[
+            artist_key(id) for id in venue_artist_ids(venue_id)])
+        db.session.commit()
+    except:
+        error = True
+        db.session.rollback()
+        failed_commit()
+    finally:
+        db.session.close()
+
+    if error:
+        flash('Error Updating venue with id ' + venue_id)
+    else:
+        name_index.add('venue', venue_id, form.name.data)
+        flash('Venue was successfully Updated')
+    return redirect(url_for('.show_venue', venue_id=venue_id))
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    # called upon submitting the new artist listing form
+    form = ArtistForm()
+    name = form.name.data
+    city = form.city.data
+    state = form.state.data
+    phone = form.phone.data
+    image_link = form.image_link.data
+    genres = form.genres.data
+    facebook_link = form.facebook_link.data
+    website_link = form.website_link.data
+    seeking_venue = form.seeking_venue.data
+    seeking_description = form.seeking_description.data
+
+    form_valid = form.validate_on_submit()
+    if form_valid:
+        error = False
+        data = {}
+        try:
+            newArtist = Artist(
+                name=name,
+                city=city,
+                state=state,
+                phone=phone,
+                image_link=image_link,
+                genres=genres,
+                facebook_link=facebook_link,
+                website_link=website_link,
+                seeking_venue=seeking_venue,
+                seeking_description=seeking_description
+            )
+            data['name'] = newArtist.name
+            db.session.add(newArtist)
+            db.session.commit()
+            data['id'] = newArtist.id
+        except:
+            error = True
+            db.session.rollback()
+            failed_commit()
+        finally:
+            db.session.close()
+
+        if(error):
+            flash('An error occurred. Artist ' +
+                  data['name'] + ' could not be listed.')
+        else:
+            name_index.add('artist', data['id'], data['name'])
+            flash('Artist ' + data['name'] + ' was successfully listed!')
+
+    else:
+        for field, message in form.errors.items():
+            flash(field + ' - ' + str(message))
+
+    return render_template('pages/home.html')
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@bp.route('/shows')
+@conditional(Show, Artist, Venue, step=CLOCK_STEP)
+def shows():
+    # displays shows at /shows, upcoming ones unless ?from= or ?to= is given;
+    # ?venue= and ?artist= narrow the list to one venue or artist. A window
+    # with only ?to= is open towards the past, so it is listed newest first
+    start = _window_arg('from')
+    end = _window_arg('to')
+    if start is None and end is None:
+        start = current_window(CLOCK_STEP)
+    descending = start is None
+    venue_id = request.args.get('venue', type=int)
+    artist_id = request.args.get('artist', type=int)
+
+    shows = db.session.query(
+        Venue.id,
+        Venue.name,
+        Artist.id,
+        Artist.name,
+        Artist.image_link,
+        Show.start_time,
+        Show.id,
+        Show.updated_at,
+        Artist.updated_at,
+        Venue.updated_at,
+    ).join(Artist).join(Venue)
+    shows = show_window(shows, start, end, venue_id, artist_id)
+    shows, next_cursor = paginate(
+        shows, [Show.start_time, Show.id], key=lambda show: [show[5], show[6]],
+        descending=descending)
+
+    data = []
+
+    for show in shows:
+        data.append({
+            'venue_id': show[0],
+            'venue_name': show[1],
+            'artist_id': show[2],
+            'artist_name': show[3],
+            'artist_image_link': show[4],
+            'start_time': show[5],
+            # fragment cache key: changes when the show, artist or venue does
+            'tile_key': 'show-tile:%s:%s:%s:%s' % (
+                show[6], show[7], show[8], show[9]),
+        })
+    # carried over to the next page
+    filters = {name: request.args[name] for name in ('from', 'to', 'venue', 'artist')
+               if request.args.get(name)}
+    return render_template('pages/shows.html', shows=data, next_cursor=next_cursor,
+                           filters=filters, window_start=start)
+
+
+@bp.route('/shows/calendar')
+@conditional(Show, Venue, step=CLOCK_STEP)
+def shows_calendar():
+    # show counts per venue in day or week buckets: ?bucket=day|week,
+    # ?from=, ?to=, ?venue=, ?artist=
+    bucket = request.args.get('bucket', 'week')
+    if bucket not in CALENDAR_BUCKETS:
+        abort(400)
+    step, default_buckets, max_buckets = CALENDAR_BUCKETS[bucket]
+    start = (_window_arg('from') or current_window(CLOCK_STEP)).replace(
+        hour=0, minute=0, second=0, microsecond=0)
+    if bucket == 'week':
+        start -= timedelta(days=start.weekday())
+    end = _window_arg('to') or start + default_buckets * step
+    end = min(end, start + max_buckets * step)
+    periods = []
+    period = start
+    while period < end:
+        periods.append(period)
+        period += step
+
+    artist_id = request.args.get('artist', type=int)
+    venues = calendar_venues(start, end, artist_id)
+    venue_id = request.args.get('venue', type=int)
+    if venue_id is not None:
+        venues = venues.filter(Venue.id == venue_id)
+    venues, next_cursor = paginate(venues, [Venue.id], key=lambda venue: [venue.id])
+    counts = calendar_counts(
+        [venue.id for venue in venues], start, end, bucket, artist_id) if venues else {}
+
+    data = []
+    for venue in venues:
+        cells = []
+        for period in periods:
+            window = {'from': period.isoformat(), 'to': (period + step).isoformat()}
+            cells.append({
+                'count': counts.get((venue.id, period), 0),
+                'url': url_for('.shows', venue=venue.id, artist=artist_id, **window),
+            })
+        data.append({'id': venue.id, 'name': venue.name, 'cells': cells})
+    filters = {name: request.args[name] for name in ('bucket', 'from', 'to', 'venue', 'artist')
+               if request.args.get(name)}
+    return render_template('pages/calendar.html', venues=data, periods=periods, bucket=bucket,
+                           next_cursor=next_cursor, filters=filters)
+
+
+@bp.route('/shows/create')
+def create_shows():
+    # renders form. do not touch.
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+    # called to create new shows in the db, upon submitting new show listing form
+    form = ShowForm()
+    artist_id = form.artist_id.data
+    venue_id = form.venue_id.data
+    start_time = form.start_time.data
+
+    error = False
+
+    try:
+        newShow = Show(
+            artist_id=artist_id,
+            venue_id=venue_id,
+            start_time=start_time
+        )
+        db.session.add(newShow)
+        cache.invalidate(artist_key(artist_id), venue_key(venue_id))
+        db.session.commit()
+    except:
+        error = True
+        db.session.rollback()
+        failed_commit()
+    finally:
+        db.session.close()
+
+    if(error):
+        flash('An error occurred. Show could not be listed.')
+    else:
+        flash('Show was successfully listed!')
+
+    return render_template('pages/home.html')
+
+
+@bp.route('/autocomplete')
+def autocomplete():
+    # typeahead for the search boxes: ?q=<prefix>[&type=artist|venue][&limit=]
+    return jsonify(name_index.lookup(
+        request.args.get('q', ''), request.args.get('type'),
+        request.args.get('limit', type=int)))
+
+
+def autocomplete_stats():
+    return jsonify(name_index.stats())
+
+
+def cache_stats():
+    fragment_cache = current_app.jinja_env.fragment_cache
+    return jsonify({
+        'views': cache.stats(),
+        'fragments': {
+            'hits': fragment_cache.hits,
+            'misses': fragment_cache.misses,
+            'evictions': fragment_cache.evictions,
+        },
+    })
+
+
+@bp.record
+def _stats_pages(state):
+    # like /__profile, only served when STATS_PAGES is set
+    if state.app.config.get('STATS_PAGES'):
+        state.add_url_rule('/__autocomplete', view_func=autocomplete_stats)
+        state.add_url_rule('/__cache', view_func=cache_stats)
+
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template('errors/404.html'), 404
+
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    return render_template('errors/500.html'), 500